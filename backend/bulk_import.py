@@ -0,0 +1,215 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from slugify import slugify
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Category, Product
+from schemas import CreateProduct
+
+CHUNK_SIZE = 500
+MAX_LINE_LENGTH = 64 * 1024
+MAX_REPORTED_ERRORS = 1000
+CONFLICT_ERROR = "Product with this slug already exists or its category was deleted"
+
+CSV_CONTENT_TYPES = {"text/csv"}
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Разбить поток байтов тела запроса на строки, не читая его целиком.
+
+    Args:
+        stream: Асинхронный итератор по кускам тела запроса
+    Returns:
+        AsyncIterator: Строки без символов перевода строки
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    try:
+        async for chunk in stream:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+            if len(buffer) > MAX_LINE_LENGTH:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Row is too long",
+                )
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be UTF-8 encoded"
+        )
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_records(
+    lines: AsyncIterator[str], content_type: str
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    Превратить строки CSV (с заголовком) или NDJSON в словари.
+
+    Args:
+        lines: Асинхронный итератор по строкам тела запроса
+        content_type: MIME тип тела запроса
+    Returns:
+        AsyncIterator: Номер строки, запись или None, текст ошибки или None
+    """
+    header = None
+    row = 0
+    async for line in lines:
+        row += 1
+        if not line.strip():
+            continue
+
+        if content_type in NDJSON_CONTENT_TYPES:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield row, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield row, None, "Row must be a JSON object"
+                continue
+            yield row, record, None
+            continue
+
+        # Поля со встроенными переводами строк не поддерживаются: CSV читается построчно.
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, dict(zip(header, values)), None
+
+
+def _add_error(report: dict, row: int, detail: str):
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row, "detail": detail})
+    else:
+        report["errors_truncated"] = True
+
+
+async def _flush(
+    db: AsyncSession,
+    chunk: list[tuple[int, CreateProduct]],
+    supplier_id: int | None,
+    report: dict,
+):
+    """
+    Проверить категории и slug пачки одним запросом каждое и вставить пачку.
+
+    Проверка и вставка не атомарны: параллельная запись может занять slug или
+    удалить категорию между ними. Тогда пачка откатывается и вставляется по
+    одной строке, а конфликтующие строки попадают в отчет.
+    """
+    category_ids = await db.scalars(
+        select(Category.id).where(Category.id.in_({product.category for _, product in chunk}))
+    )
+    known_categories = set(category_ids.all())
+    taken_slugs = await db.scalars(
+        select(Product.slug).where(
+            Product.slug.in_({slugify(product.name) for _, product in chunk})
+        )
+    )
+    taken = set(taken_slugs.all())
+
+    rows = []
+    for row, product in chunk:
+        slug = slugify(product.name)
+        if product.category not in known_categories:
+            _add_error(report, row, "There is no category found")
+            continue
+        if slug in taken:
+            _add_error(report, row, "Product with this slug already exists")
+            continue
+        taken.add(slug)
+        values = {
+            "name": product.name,
+            "slug": slug,
+            "description": product.description,
+            "price": product.price,
+            "image_url": product.image_url,
+            "category_id": product.category,
+            "rating": 0.0,
+            "stock": product.stock,
+            "supplier_id": supplier_id,
+        }
+        rows.append((row, values))
+
+    if not rows:
+        return
+
+    try:
+        await db.execute(insert(Product), [values for _, values in rows])
+        await db.commit()
+        report["inserted"] += len(rows)
+        return
+    except IntegrityError:
+        await db.rollback()
+
+    for row, values in rows:
+        try:
+            await db.execute(insert(Product).values(values))
+            await db.commit()
+            report["inserted"] += 1
+        except IntegrityError:
+            await db.rollback()
+            _add_error(report, row, CONFLICT_ERROR)
+
+
+async def import_products(
+    db: AsyncSession,
+    records: AsyncIterator[tuple[int, dict | None, str | None]],
+    supplier_id: int | None,
+) -> dict:
+    """
+    Провалидировать записи по схеме CreateProduct и вставить их пачками.
+
+    Каждая пачка вставляется одним INSERT с набором параметров (executemany) и
+    фиксируется отдельной транзакцией, поэтому память не зависит от размера
+    файла. Уже зафиксированные пачки не откатываются, если следующая упадет:
+    строки, конфликтующие с параллельными записями, попадают в отчет.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        records: Записи из iter_records
+        supplier_id: id поставщика, от имени которого идет импорт
+    Returns:
+        dict: Отчет с количеством вставленных строк и ошибками по строкам
+    """
+    report = {"inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    chunk = []
+    async for row, record, error in records:
+        if error is None:
+            try:
+                chunk.append((row, CreateProduct.model_validate(record)))
+            except ValidationError as ex:
+                error = "; ".join(
+                    f"{'.'.join(map(str, item['loc']))}: {item['msg']}"
+                    for item in ex.errors()
+                )
+        if error is not None:
+            _add_error(report, row, error)
+            continue
+
+        if len(chunk) >= CHUNK_SIZE:
+            await _flush(db, chunk, supplier_id, report)
+            chunk = []
+
+    if chunk:
+        await _flush(db, chunk, supplier_id, report)
+    return report
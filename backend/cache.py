@@ -0,0 +1,160 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+import config
+
+
+def model_to_dict(instance) -> dict:
+    """
+    Снимок колонок ORM объекта в виде словаря, пригодного для кэша.
+
+    Args:
+        instance: Объект модели SQLAlchemy
+    Returns:
+        dict: Значения колонок таблицы
+    """
+    return {
+        column.key: getattr(instance, column.key)
+        for column in instance.__table__.columns
+    }
+
+
+class BaseCache:
+    """
+    Общий интерфейс бэкендов кэша и счетчики попаданий.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    async def get(self, key: str) -> Any | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        raise NotImplementedError
+
+    async def delete(self, *keys: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """
+        Получить счетчики кэша.
+
+        Returns:
+            dict: Попадания, промахи, доля попаданий, вытеснения и истекшие записи
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+
+class LRUCache(BaseCache):
+    """
+    Кэш в памяти процесса с вытеснением давно неиспользуемых записей и TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "size": len(self._data)}
+
+
+class RedisCache(BaseCache):
+    """
+    Кэш в Redis, общий для всех воркеров. Значения хранятся в JSON.
+
+    Подходит любой клиент с асинхронными методами get/set/delete,
+    совместимыми с redis.asyncio.Redis.
+    """
+
+    def __init__(self, client, ttl: float, prefix: str):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any | None:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        await self.client.set(
+            self.prefix + key,
+            json.dumps(value, default=str),
+            ex=max(int(self.ttl if ttl is None else ttl), 1),
+        )
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+def build_cache(backend: str, maxsize: int, ttl: float, prefix: str) -> BaseCache:
+    """
+    Создать кэш по имени бэкенда из настроек.
+
+    Args:
+        backend: "memory" или "redis"
+        maxsize: Максимальное число записей кэша в памяти
+        ttl: Время жизни записи в секундах
+        prefix: Префикс ключей в Redis
+    Returns:
+        BaseCache: Экземпляр кэша
+    """
+    if backend == "redis":
+        from redis.asyncio import Redis
+
+        return RedisCache(Redis.from_url(config.REDIS_URL), ttl=ttl, prefix=prefix)
+    return LRUCache(maxsize=maxsize, ttl=ttl)
+
+
+product_cache = build_cache(
+    config.PRODUCT_CACHE_BACKEND,
+    maxsize=config.PRODUCT_CACHE_SIZE,
+    ttl=config.PRODUCT_CACHE_TTL,
+    prefix="product:",
+)
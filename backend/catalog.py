@@ -0,0 +1,145 @@
+from typing import Annotated
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Category, Product
+from models.products import NULL_SORT_VALUE, sort_key
+from pagination import after_cursor, decode_cursor
+from schemas import ProductSort
+
+# Поля ключа сортировки и направление для каждого варианта сортировки.
+SORT_KEYS = {
+    ProductSort.id: (("id",), False),
+    ProductSort.newest: (("id",), True),
+    ProductSort.price: (("price", "id"), False),
+    ProductSort.price_desc: (("price", "id"), True),
+    ProductSort.rating: (("rating", "id"), False),
+    ProductSort.rating_desc: (("rating", "id"), True),
+}
+
+# Выражения ORDER BY и курсора для полей ключа. Цена и рейтинг могут быть NULL,
+# такие продукты идут первыми по возрастанию и последними по убыванию.
+SORT_COLUMNS = {
+    "id": Product.id,
+    "price": sort_key(Product.price),
+    "rating": sort_key(Product.rating),
+}
+
+
+class ProductFilters:
+    """
+    Фильтры и сортировка списка продуктов из параметров запроса.
+
+    Используется как зависимость: Depends(ProductFilters).
+    """
+
+    def __init__(
+        self,
+        min_price: Annotated[int | None, Query(ge=0)] = None,
+        max_price: Annotated[int | None, Query(ge=0)] = None,
+        min_rating: Annotated[float | None, Query(ge=0, le=10)] = None,
+        supplier_id: Annotated[list[int] | None, Query()] = None,
+        sort: ProductSort = ProductSort.id,
+    ):
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="min_price must not be greater than max_price",
+            )
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_rating = min_rating
+        self.supplier_id = supplier_id
+        self.fields, self.descending = SORT_KEYS[sort]
+        self.columns = [SORT_COLUMNS[field] for field in self.fields]
+
+    def conditions(self) -> list:
+        """
+        Условия WHERE для выбранных фильтров.
+
+        Returns:
+            list: Выражения SQLAlchemy
+        """
+        conditions = []
+        if self.min_price is not None:
+            conditions.append(Product.price >= self.min_price)
+        if self.max_price is not None:
+            conditions.append(Product.price <= self.max_price)
+        if self.min_rating is not None:
+            conditions.append(Product.rating >= self.min_rating)
+        if self.supplier_id:
+            conditions.append(Product.supplier_id.in_(self.supplier_id))
+        return conditions
+
+    def order_by(self) -> list:
+        return [
+            column.desc() if self.descending else column for column in self.columns
+        ]
+
+    def after(self, cursor: str):
+        """
+        Условие продолжения выдачи после курсора.
+
+        Args:
+            cursor: Курсор из параметра запроса
+        Returns:
+            Выражение SQLAlchemy для фильтрации
+        """
+        values = decode_cursor(cursor, len(self.columns))
+        return after_cursor(self.columns, values, descending=self.descending)
+
+    def key(self, product: Product) -> list:
+        values = [getattr(product, field) for field in self.fields]
+        return [NULL_SORT_VALUE if value is None else value for value in values]
+
+
+async def facet_counts(
+    db: AsyncSession, conditions: list, price_bucket_size: int, join_category: bool
+) -> dict:
+    """
+    Посчитать количество продуктов по категориям и ценовым диапазонам одним запросом.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        conditions: Условия WHERE, как у основного запроса
+        price_bucket_size: Ширина ценового диапазона
+        join_category: Нужно ли присоединять таблицу категорий для условий
+    Returns:
+        dict: Счетчики по категориям и ценовым диапазонам
+    """
+    source = Product.__table__.join(Category.__table__) if join_category else Product
+    bucket = Product.price // price_bucket_size
+    by_category = (
+        select(
+            literal("category").label("facet"),
+            Product.category_id.label("value"),
+            func.count().label("count"),
+        )
+        .select_from(source)
+        .where(*conditions)
+        .group_by(Product.category_id)
+    )
+    by_price = (
+        select(literal("price"), bucket, func.count())
+        .select_from(source)
+        .where(*conditions)
+        .group_by(bucket)
+    )
+
+    facets = {"categories": [], "price_buckets": []}
+    for facet, value, count in await db.execute(union_all(by_category, by_price)):
+        if facet == "category":
+            facets["categories"].append({"category_id": value, "count": count})
+        elif value is not None:
+            facets["price_buckets"].append(
+                {
+                    "min_price": value * price_bucket_size,
+                    "max_price": (value + 1) * price_bucket_size - 1,
+                    "count": count,
+                }
+            )
+    facets["categories"].sort(key=lambda item: item["category_id"])
+    facets["price_buckets"].sort(key=lambda item: item["min_price"])
+    return facets
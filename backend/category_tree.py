@@ -0,0 +1,115 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.versions import resource_versions
+from models.categories import Category
+
+
+class CategoryTree:
+    """
+    Кэш дерева категорий в памяти процесса.
+
+    Таблица categories читается целиком одним запросом, после чего хранятся
+    списки смежности и заранее посчитанные множества id потомков каждой категории.
+    Дерево запоминает версию ресурса categories, с которой было прочитано, и
+    перечитывается, когда запись в любом воркере увеличила эту версию.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.version: tuple | None = None
+        self.by_id: dict[int, dict] = {}
+        self.by_slug: dict[str, dict] = {}
+        self.children: dict[int, list[int]] = {}
+        self.descendants: dict[int, frozenset[int]] = {}
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """
+        Загрузить дерево при первом обращении или после изменения категорий.
+
+        Args:
+            db: Объект асинхронной сессии с базой данных
+        """
+        version = await resource_versions.current("categories")
+        if version == self.version:
+            return
+        async with self._lock:
+            # Пока запрос ждал блокировку, дерево мог перечитать другой запрос.
+            if version != self.version:
+                await self._load(db, version)
+
+    async def refresh(self, db: AsyncSession):
+        """
+        Перечитать таблицу категорий и пересобрать дерево.
+
+        Args:
+            db: Объект асинхронной сессии с базой данных
+        """
+        async with self._lock:
+            await self._load(db, await resource_versions.current("categories"))
+
+    async def _load(self, db: AsyncSession, version: tuple):
+        rows = (
+            await db.execute(
+                select(
+                    Category.id,
+                    Category.name,
+                    Category.slug,
+                    Category.is_active,
+                    Category.parent_id,
+                ).order_by(Category.id)
+            )
+        ).mappings()
+        by_id = {row["id"]: dict(row) for row in rows}
+        children: dict[int, list[int]] = {category_id: [] for category_id in by_id}
+        for category in by_id.values():
+            if category["parent_id"] in children:
+                children[category["parent_id"]].append(category["id"])
+
+        self.by_id = by_id
+        self.by_slug = {category["slug"]: category for category in by_id.values()}
+        self.children = children
+        self.descendants = {
+            category_id: self._collect(category_id, children)
+            for category_id in by_id
+        }
+        self.version = version
+
+    @staticmethod
+    def _collect(root_id: int, children: dict[int, list[int]]) -> frozenset[int]:
+        """
+        Обойти поддерево категории, защищаясь от циклов в parent_id.
+        """
+        seen = {root_id}
+        stack = [root_id]
+        while stack:
+            for child_id in children[stack.pop()]:
+                if child_id not in seen:
+                    seen.add(child_id)
+                    stack.append(child_id)
+        return frozenset(seen)
+
+    def subtree_ids(self, category_id: int) -> frozenset[int]:
+        """
+        Получить id категории и всех её потомков на любой глубине.
+
+        Args:
+            category_id: id корневой категории
+        Returns:
+            frozenset: Множество id категорий поддерева
+        """
+        return self.descendants.get(category_id, frozenset((category_id,)))
+
+    def active(self) -> list[dict]:
+        """
+        Получить все активные категории.
+
+        Returns:
+            list: Список категорий
+        """
+        return [category for category in self.by_id.values() if category["is_active"]]
+
+
+category_tree = CategoryTree()
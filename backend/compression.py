@@ -0,0 +1,175 @@
+import zlib
+from collections import OrderedDict
+
+import config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self.level = level
+        self._stream = None
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_chunk(self, data: bytes) -> bytes:
+        if self._stream is None:
+            self._stream = zlib.compressobj(self.level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        return self._stream.compress(data) + self._stream.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._stream.flush() if self._stream is not None else b""
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._stream = None
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def compress_chunk(self, data: bytes) -> bytes:
+        if self._stream is None:
+            self._stream = self._compressor.compressobj()
+        return self._stream.compress(data) + self._stream.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._stream.flush() if self._stream is not None else b""
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level: int):
+        self.level = level
+        self._stream = None
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.level)
+
+    def compress_chunk(self, data: bytes) -> bytes:
+        if self._stream is None:
+            self._stream = brotli.Compressor(quality=self.level)
+        return self._stream.process(data) + self._stream.flush()
+
+    def finish(self) -> bytes:
+        return self._stream.finish() if self._stream is not None else b""
+
+
+# Кодировки в порядке предпочтения сервера. zstd и brotli доступны, только
+# если установлены пакеты zstandard и brotli.
+ENCODERS = {
+    name: (encoder, level)
+    for name, encoder, level, available in (
+        ("zstd", ZstdEncoder, config.COMPRESSION_ZSTD_LEVEL, zstandard is not None),
+        ("br", BrotliEncoder, config.COMPRESSION_BROTLI_LEVEL, brotli is not None),
+        ("gzip", GzipEncoder, config.COMPRESSION_GZIP_LEVEL, True),
+    )
+    if available
+}
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """
+    Выбрать кодировку ответа по заголовку Accept-Encoding.
+
+    Args:
+        accept_encoding: Значение заголовка Accept-Encoding
+    Returns:
+        str: Имя кодировки или None, если сжимать не нужно
+    """
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    for name in ENCODERS:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+def create_encoder(name: str):
+    encoder, level = ENCODERS[name]
+    return encoder(level)
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressedCache:
+    """
+    Кэш уже сжатых тел ответов, ограниченный суммарным размером в байтах.
+
+    Ключ - ETag ответа и кодировка. ETag строится из версий ресурсов, поэтому
+    после изменения данных старые записи просто перестают запрашиваться и
+    вытесняются.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    def get(self, etag: str, encoding: str) -> bytes | None:
+        body = self._data.get((etag, encoding))
+        if body is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end((etag, encoding))
+        self.hits += 1
+        return body
+
+    def set(self, etag: str, encoding: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        previous = self._data.pop((etag, encoding), None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._data[(etag, encoding)] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": self.size}
+
+
+compressed_cache = CompressedCache(max_bytes=config.COMPRESSION_CACHE_BYTES)
@@ -1,15 +1,157 @@
+import itertools
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from config import DATABASE_URL
+from config import DATABASE_URL, DB_REPLICA_RETRY_INTERVAL, DB_REPLICA_URLS
+
+
+class QueryStats:
+    """
+    Статистика SQL запросов, выполненных при обработке одного HTTP запроса.
+    """
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self, track_statements: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter | None = Counter() if track_statements else None
+
+    def server_timing(self) -> str:
+        """
+        Значение заголовка Server-Timing.
+
+        Returns:
+            str: Время в базе данных в миллисекундах и число запросов
+        """
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Одинаковые запросы, выполненные не менее threshold раз (признак N+1).
+
+        Args:
+            threshold: Минимальное число повторов
+        Returns:
+            list: Текст запроса и число повторов
+        """
+        if self.statements is None:
+            return []
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    if stats is None or context is None:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - context.query_started_at
+    if stats.statements is not None:
+        stats.statements[statement] += 1
+
+
+def instrument(async_engine):
+    """
+    Подписать движок на события, собирающие статистику запросов в query_stats.
+
+    Args:
+        async_engine: Асинхронный движок SQLAlchemy
+    """
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
 
 engine = create_async_engine(
     DATABASE_URL, echo=True
 )
+instrument(engine)
 async_session_maker = async_sessionmaker(
     bind=engine, expire_on_commit=False, class_=AsyncSession
 )
 
 
+class ReplicaSet:
+    """
+    Реплики базы данных для запросов только на чтение.
+
+    Реплики выбираются по кругу. Реплика, к которой не удалось подключиться,
+    исключается на retry_interval секунд. Если доступных реплик нет, сессия
+    открывается на основной базе данных.
+    """
+
+    def __init__(self, urls: list[str], retry_interval: float):
+        self.urls = urls
+        self.retry_interval = retry_interval
+        self.engines = [
+            create_async_engine(url, echo=True, pool_pre_ping=True) for url in urls
+        ]
+        for replica in self.engines:
+            instrument(replica)
+        self.session_makers = [
+            async_sessionmaker(bind=replica, expire_on_commit=False, class_=AsyncSession)
+            for replica in self.engines
+        ]
+        self._down_until = [0.0] * len(urls)
+        self._counter = itertools.count()
+
+    def _candidates(self) -> list[int]:
+        now = time.monotonic()
+        healthy = [
+            index for index, down_until in enumerate(self._down_until) if down_until <= now
+        ]
+        if not healthy:
+            return []
+        start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, index: int, error: Exception):
+        self._down_until[index] = time.monotonic() + self.retry_interval
+        logger.warning(f"Replica {index} is unavailable: {error}")
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Открыть сессию на следующей доступной реплике.
+        """
+        for index in self._candidates():
+            session = self.session_makers[index]()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as error:
+                await session.close()
+                self.mark_down(index, error)
+                continue
+            async with session:
+                yield session
+            return
+
+        async with async_session_maker() as session:
+            yield session
+
+
+replica_set = ReplicaSet(DB_REPLICA_URLS, retry_interval=DB_REPLICA_RETRY_INTERVAL)
+
+
 class Base(DeclarativeBase):
     pass
@@ -1,8 +1,75 @@
+import time
 from typing import AsyncGenerator
 
-from backend.db import async_session_maker
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+import config
+from backend.db import async_session_maker, replica_set
 
-async def get_db() -> AsyncGenerator[AsyncGenerator, None]:
+READ_YOUR_WRITES_COOKIE = "primary_until"
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+async def get_db(
+    request: Request, response: Response
+) -> AsyncGenerator[AsyncGenerator, None]:
+    # После записи клиент на время читает с основной базы, а не с реплик.
+    if replica_set.engines and request.method not in SAFE_METHODS:
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            str(int(time.time() + config.READ_YOUR_WRITES_SECONDS)),
+            max_age=int(config.READ_YOUR_WRITES_SECONDS),
+            httponly=True,
+        )
     async with async_session_maker() as session:
         yield session
+
+
+def get_session_factory() -> async_sessionmaker:
+    """
+    Фабрика сессий основной базы данных для маршрутов, которые открывают сессию
+    сами, например только внутри вычисления, общего для нескольких запросов.
+    Как и get_db, подменяется через dependency_overrides.
+    """
+    return async_session_maker
+
+
+def wants_primary(request: Request) -> bool:
+    """
+    Проверить, должен ли запрос читать с основной базы данных.
+
+    Клиент может явно попросить об этом заголовком X-Read-Your-Writes,
+    а после записи это делает cookie primary_until.
+
+    Args:
+        request: Объект запроса
+    Returns:
+        bool: Читать с основной базы данных
+    """
+    if request.headers.get(READ_YOUR_WRITES_HEADER):
+        return True
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_session(request: Request):
+    """
+    Сессия для запроса только на чтение: реплика или основная база данных.
+
+    Args:
+        request: Объект запроса
+    Returns:
+        Асинхронный контекстный менеджер сессии
+    """
+    if replica_set.engines and not wants_primary(request):
+        return replica_set.session()
+    return async_session_maker()
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncGenerator, None]:
+    async with read_session(request) as session:
+        yield session
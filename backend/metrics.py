@@ -0,0 +1,130 @@
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами корзин, как в Prometheus.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+class HTTPMetrics:
+    """
+    Метрики HTTP запросов в памяти процесса в формате Prometheus.
+
+    Запросы группируются по шаблону маршрута, а не по фактическому пути,
+    поэтому число рядов не зависит от значений параметров в URL.
+    """
+
+    def __init__(self):
+        self.requests: defaultdict[tuple, int] = defaultdict(int)
+        self.latency: dict[tuple, Histogram] = {}
+        self.response_size: dict[tuple, Histogram] = {}
+        self.in_progress: defaultdict[str, int] = defaultdict(int)
+        self.collectors: list[Callable[[], list[tuple[str, str, float]]]] = []
+
+    def observe(self, method: str, route: str, status: int, duration: float, size: int):
+        """
+        Учесть завершенный запрос.
+
+        Args:
+            method: HTTP метод
+            route: Шаблон маршрута
+            status: Код ответа
+            duration: Длительность в секундах
+            size: Размер тела ответа в байтах
+        """
+        self.requests[(method, route, status)] += 1
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.response_size[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(duration)
+        self.response_size[key].observe(size)
+
+    def add_collector(self, collector: Callable[[], list[tuple[str, str, float]]]):
+        """
+        Добавить функцию, возвращающую значения метрик на момент выгрузки.
+
+        Args:
+            collector: Функция, возвращающая список (имя, тип, значение).
+                Имя может содержать метки: name{label="value"}
+        """
+        self.collectors.append(collector)
+
+    def _histogram(self, lines: list, name: str, label_names: tuple, histograms: dict):
+        lines.append(f"# TYPE {name} histogram")
+        for values, histogram in histograms.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                labels = format_labels(label_names + ("le",), values + (bound,))
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = format_labels(label_names + ("le",), values + ("+Inf",))
+            lines.append(f"{name}_bucket{labels} {histogram.count}")
+            labels = format_labels(label_names, values)
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    def render(self) -> str:
+        """
+        Выгрузить метрики в текстовом формате Prometheus.
+
+        Returns:
+            str: Текст для эндпоинта /metrics
+        """
+        lines = ["# TYPE http_requests_total counter"]
+        for values, count in self.requests.items():
+            labels = format_labels(("method", "route", "status"), values)
+            lines.append(f"http_requests_total{labels} {count}")
+
+        lines.append("# TYPE http_requests_in_progress gauge")
+        for method, count in self.in_progress.items():
+            lines.append(f"http_requests_in_progress{format_labels(('method',), (method,))} {count}")
+
+        self._histogram(
+            lines, "http_request_duration_seconds", ("method", "route"), self.latency
+        )
+        self._histogram(
+            lines, "http_response_size_bytes", ("method", "route"), self.response_size
+        )
+
+        typed = set()
+        for collector in self.collectors:
+            for name, kind, value in collector():
+                family = name.partition("{")[0]
+                if family not in typed:
+                    typed.add(family)
+                    lines.append(f"# TYPE {family} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+http_metrics = HTTPMetrics()
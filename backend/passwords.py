@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+import config
+
+
+class PasswordHasher:
+    """
+    Хэширование и проверка паролей bcrypt в отдельном пуле потоков.
+
+    bcrypt отпускает GIL, поэтому вычисления идут параллельно с циклом событий,
+    а семафор ограничивает число одновременных хэширований. Запросы сверх
+    лимита ждут своей очереди, глубина очереди доступна в stats().
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int):
+        self.context = context
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.max_waiting = 0
+
+    async def _run(self, func, *args):
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        acquired = False
+        try:
+            async with self._semaphore:
+                acquired = True
+                self.waiting -= 1
+                self.running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._executor, func, *args)
+                finally:
+                    self.running -= 1
+                    self.completed += 1
+        finally:
+            if not acquired:
+                self.waiting -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Получить хэш пароля.
+
+        Args:
+            password: Пароль в открытом виде
+        Returns:
+            str: Хэш пароля
+        """
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Проверить пароль по хэшу.
+
+        Args:
+            password: Пароль в открытом виде
+            hashed_password: Хэш из базы данных
+        Returns:
+            bool: Совпадает ли пароль
+        """
+        return await self._run(self.context.verify, password, hashed_password)
+
+    def stats(self) -> dict:
+        """
+        Получить метрики пула хэширования.
+
+        Returns:
+            dict: Размер пула, глубина очереди и количество выполненных операций
+        """
+        return {
+            "max_workers": self.max_workers,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "max_waiting": self.max_waiting,
+        }
+
+
+password_hasher = PasswordHasher(
+    CryptContext(schemes=["bcrypt"], deprecated="auto"),
+    max_workers=config.PASSWORD_HASH_WORKERS,
+)
@@ -0,0 +1,126 @@
+import math
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+
+import config
+
+
+class MemoryRateLimiter:
+    """
+    Ограничение частоты запросов алгоритмом token bucket в памяти процесса.
+
+    На каждый ключ хранится корзина емкостью limit, которая пополняется
+    равномерно за period секунд. Число ключей ограничено, давно не
+    использованные корзины вытесняются.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.rejected = 0
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        """
+        Учесть попытку и проверить лимит.
+
+        Args:
+            key: Ключ ограничения, например IP адрес клиента
+            limit: Допустимое число попыток за период
+            period: Период в секундах
+        Returns:
+            float: 0, если попытка разрешена, иначе секунды до следующей попытки
+        """
+        now = time.monotonic()
+        rate = limit / period
+        tokens, updated = self._buckets.get(key, (limit, now))
+        tokens = min(limit, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            self.rejected += 1
+            retry_after = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimiter:
+    """
+    Ограничение частоты запросов скользящим окном в Redis, общее для воркеров.
+
+    Попытки считаются в счетчиках фиксированных окон, а число попыток за
+    последние period секунд оценивается как счетчик текущего окна плюс доля
+    предыдущего, пропорциональная его перекрытию со скользящим окном.
+    """
+
+    def __init__(self, client, prefix: str):
+        self.client = client
+        self.prefix = prefix
+        self.rejected = 0
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        now = time.time()
+        window = int(now // period)
+        elapsed = now - window * period
+        current_key = f"{self.prefix}{key}:{window}"
+        previous_key = f"{self.prefix}{key}:{window - 1}"
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(period * 2))
+            pipe.get(previous_key)
+            current, _, previous = await pipe.execute()
+
+        weight = 1 - elapsed / period
+        if int(previous or 0) * weight + current <= limit:
+            return 0.0
+        self.rejected += 1
+        return period - elapsed
+
+
+def build_rate_limiter(backend: str, prefix: str):
+    """
+    Создать ограничитель частоты по имени бэкенда из настроек.
+
+    Args:
+        backend: "memory" или "redis"
+        prefix: Префикс ключей в Redis
+    Returns:
+        Экземпляр ограничителя
+    """
+    if backend == "redis":
+        from redis.asyncio import Redis
+
+        return RedisRateLimiter(Redis.from_url(config.REDIS_URL), prefix=prefix)
+    return MemoryRateLimiter(max_keys=config.RATE_LIMIT_MAX_KEYS)
+
+
+auth_rate_limiter = build_rate_limiter(config.RATE_LIMIT_BACKEND, prefix="ratelimit:")
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce(key: str, limit: int, period: float = 60):
+    """
+    Отклонить запрос с кодом 429, если превышен лимит для ключа.
+
+    Args:
+        key: Ключ ограничения
+        limit: Допустимое число попыток за период
+        period: Период в секундах
+    """
+    retry_after = await auth_rate_limiter.hit(key, limit, period)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
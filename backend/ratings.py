@@ -0,0 +1,73 @@
+from sqlalchemy import Float, case, cast, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Product
+from models.reviews import ProductGradeCount
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+async def _change_rating(
+    db: AsyncSession, product_id: int, grade: int, delta: int
+) -> str | None:
+    """
+    Изменить агрегаты рейтинга продукта на один отзыв в текущей транзакции.
+
+    Счетчики обновляются выражениями над текущими значениями строки, поэтому
+    параллельные отзывы не затирают друг друга.
+    """
+    review_count = Product.review_count + delta
+    grade_sum = Product.grade_sum + delta * grade
+    slug = await db.scalar(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(
+            review_count=review_count,
+            grade_sum=grade_sum,
+            rating=case(
+                (review_count > 0, cast(grade_sum, Float) / review_count), else_=0.0
+            ),
+        )
+        .returning(Product.slug)
+    )
+
+    insert = _INSERTS[db.get_bind().dialect.name]
+    statement = insert(ProductGradeCount).values(
+        product_id=product_id, grade=grade, count=max(delta, 0)
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ProductGradeCount.product_id, ProductGradeCount.grade],
+            set_={"count": ProductGradeCount.count + delta},
+        )
+    )
+    return slug
+
+
+async def add_grade(db: AsyncSession, product_id: int, grade: int) -> str | None:
+    """
+    Учесть новый отзыв в рейтинге продукта.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        product_id: id продукта
+        grade: Оценка отзыва
+    Returns:
+        str: slug продукта
+    """
+    return await _change_rating(db, product_id, grade, 1)
+
+
+async def remove_grade(db: AsyncSession, product_id: int, grade: int) -> str | None:
+    """
+    Исключить удаленный отзыв из рейтинга продукта.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        product_id: id продукта
+        grade: Оценка отзыва
+    Returns:
+        str: slug продукта
+    """
+    return await _change_rating(db, product_id, grade, -1)
@@ -0,0 +1,105 @@
+import asyncio
+import contextlib
+
+import orjson
+from loguru import logger
+
+import config
+
+
+class RequestLogWriter:
+    """
+    Фоновая запись журнала запросов в файл пачками.
+
+    Middleware только кладет запись в очередь, сериализация в JSON и запись
+    в файл выполняются в фоновой задаче. Если очередь переполнена, новые
+    записи отбрасываются, а их число доступно в dropped.
+    """
+
+    def __init__(self, path: str, batch_size: int, flush_interval: float, queue_size: int):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.written = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def submit(self, record: dict):
+        """
+        Поставить запись в очередь на запись.
+
+        Args:
+            record: Поля записи журнала
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.queue_size)
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Остановить фоновую задачу, дописав накопленные записи.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def _drain(self, batch: list) -> list:
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        batch = []
+        try:
+            while True:
+                batch.append(await self._queue.get())
+                # Ждем недолго, чтобы собрать пачку, но не дольше flush_interval.
+                try:
+                    async with asyncio.timeout(self.flush_interval):
+                        while len(self._drain(batch)) < self.batch_size:
+                            batch.append(await self._queue.get())
+                except TimeoutError:
+                    pass
+                await self._flush(batch)
+                batch = []
+        except asyncio.CancelledError:
+            while batch or not self._queue.empty():
+                await self._flush(self._drain(batch))
+                batch = []
+            raise
+
+    async def _flush(self, batch: list):
+        if not batch:
+            return
+        data = b"".join(orjson.dumps(record) + b"\n" for record in batch)
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError as ex:
+            logger.error(f"Request log write failed: {ex}")
+            return
+        self.written += len(batch)
+
+    def _write(self, data: bytes):
+        with open(self.path, "ab") as file:
+            file.write(data)
+
+
+request_log_writer = RequestLogWriter(
+    config.REQUEST_LOG_PATH,
+    batch_size=config.REQUEST_LOG_BATCH_SIZE,
+    flush_interval=config.REQUEST_LOG_FLUSH_INTERVAL,
+    queue_size=config.REQUEST_LOG_QUEUE_SIZE,
+)
@@ -0,0 +1,159 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from backend.cache import product_cache
+from backend.db import async_session_maker
+from backend.versions import resource_versions
+from models import Product
+from models.orders import Order, OrderItem
+
+RESERVATION_TTL = timedelta(minutes=config.RESERVATION_TTL_MINUTES)
+
+
+class OutOfStock(Exception):
+    """Товара на складе меньше, чем запрошено."""
+
+    def __init__(self, product_id: int):
+        super().__init__(product_id)
+        self.product_id = product_id
+
+
+async def _products_changed(slugs: list[str]):
+    if slugs:
+        await product_cache.delete(*slugs)
+        await resource_versions.bump("products")
+
+
+async def reserve(db: AsyncSession, user_id: int, items: Counter) -> Order:
+    """
+    Зарезервировать товары корзины в одной транзакции.
+
+    Остаток уменьшается условным UPDATE ... WHERE stock >= :qty RETURNING, поэтому
+    проверка и списание атомарны и не требуют предварительного SELECT. Строки
+    блокируются в порядке возрастания id, чтобы параллельные корзины не
+    взаимоблокировались.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        user_id: id покупателя
+        items: Количество товара по id продукта
+    Returns:
+        Order: Созданный заказ в статусе reserved
+    """
+    slugs = []
+    try:
+        for product_id in sorted(items):
+            slug = await db.scalar(
+                update(Product)
+                .where(
+                    Product.id == product_id,
+                    Product.is_activate == True,
+                    Product.stock >= items[product_id],
+                )
+                .values(stock=Product.stock - items[product_id])
+                .returning(Product.slug)
+            )
+            if slug is None:
+                raise OutOfStock(product_id)
+            slugs.append(slug)
+
+        order = Order(
+            user_id=user_id,
+            status="reserved",
+            expires_at=datetime.now() + RESERVATION_TTL,
+        )
+        db.add(order)
+        await db.flush()
+        await db.execute(
+            insert(OrderItem),
+            [
+                {"order_id": order.id, "product_id": product_id, "quantity": quantity}
+                for product_id, quantity in items.items()
+            ],
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    await _products_changed(slugs)
+    return order
+
+
+async def release(db: AsyncSession, order_ids: list[int]):
+    """
+    Вернуть на склад товар из заказов. Вызывается в транзакции, которая уже
+    перевела заказы из статуса reserved.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        order_ids: id заказов
+    """
+    rows = await db.execute(
+        select(OrderItem.product_id, OrderItem.quantity).where(
+            OrderItem.order_id.in_(order_ids)
+        )
+    )
+    quantities = Counter()
+    for product_id, quantity in rows:
+        quantities[product_id] += quantity
+
+    slugs = []
+    for product_id in sorted(quantities):
+        slug = await db.scalar(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock=Product.stock + quantities[product_id])
+            .returning(Product.slug)
+        )
+        slugs.append(slug)
+    await db.commit()
+    await _products_changed(slugs)
+
+
+async def expire_reservations(db: AsyncSession) -> int:
+    """
+    Перевести просроченные резервы в статус expired и вернуть товар на склад.
+
+    Заказы захватываются одним UPDATE ... RETURNING, поэтому несколько воркеров
+    могут выполнять очистку одновременно без двойного возврата.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+    Returns:
+        int: Количество просроченных заказов
+    """
+    order_ids = (
+        await db.scalars(
+            update(Order)
+            .where(Order.status == "reserved", Order.expires_at < datetime.now())
+            .values(status="expired")
+            .returning(Order.id)
+        )
+    ).all()
+    if not order_ids:
+        await db.commit()
+        return 0
+    await release(db, order_ids)
+    return len(order_ids)
+
+
+async def expire_reservations_forever():
+    """
+    Фоновая задача приложения: периодически освобождать просроченные резервы.
+    """
+    while True:
+        await asyncio.sleep(config.RESERVATION_EXPIRY_INTERVAL)
+        try:
+            async with async_session_maker() as session:
+                expired = await expire_reservations(session)
+            if expired:
+                logger.info(f"Expired {expired} reservations")
+        except Exception as ex:
+            logger.error(f"Reservation expiry failed: {ex}")
@@ -0,0 +1,168 @@
+import asyncio
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from backend.db import async_session_maker
+from models.users import User
+
+
+class TokenGenerations:
+    """
+    Поколения токенов пользователей для мгновенного отзыва прав.
+
+    В каждый токен записывается users.token_version на момент выдачи. Смена
+    прав или выход увеличивает версию, и все ранее выданные токены пользователя
+    становятся недействительными. Проверка в get_current_user - поиск в словаре
+    процесса без запроса к базе данных. Между воркерами версии синхронизируются
+    через хэш в Redis, а при старте загружаются из базы данных.
+    """
+
+    key = "token_generations"
+
+    def __init__(self, store=None):
+        self.store = store
+        self._generations: dict[int, int] = {}
+
+    def current(self, user_id: int) -> int:
+        return self._generations.get(user_id, 0)
+
+    def is_revoked(self, user_id: int, generation: int) -> bool:
+        """
+        Проверить, отозван ли токен.
+
+        Args:
+            user_id: id пользователя из токена
+            generation: Поколение, записанное в токен
+        Returns:
+            bool: Токен выдан до последнего отзыва
+        """
+        return generation < self.current(user_id)
+
+    def _merge(self, user_id: int, generation: int):
+        if generation > self.current(user_id):
+            self._generations[user_id] = generation
+
+    async def publish(self, generations: dict[int, int]):
+        """
+        Запомнить новые поколения пользователей и разослать их другим воркерам.
+
+        Args:
+            generations: Новые значения users.token_version по id пользователя
+        """
+        for user_id, generation in generations.items():
+            self._merge(user_id, generation)
+        if self.store is not None and generations:
+            await self.store.hset(
+                self.key,
+                mapping={str(user_id): gen for user_id, gen in generations.items()},
+            )
+
+    async def load(self, db: AsyncSession):
+        """
+        Загрузить поколения пользователей, у которых токены уже отзывались.
+
+        Args:
+            db: Объект асинхронной сессии с базой данных
+        """
+        rows = await db.execute(
+            select(User.id, User.token_version).where(User.token_version > 0)
+        )
+        for user_id, generation in rows:
+            self._merge(user_id, generation)
+
+    async def sync(self):
+        """
+        Подтянуть поколения, опубликованные другими воркерами.
+        """
+        if self.store is None:
+            return
+        for user_id, generation in (await self.store.hgetall(self.key)).items():
+            self._merge(int(user_id), int(generation))
+
+
+def build_token_generations(backend: str) -> TokenGenerations:
+    """
+    Создать реестр поколений токенов по имени бэкенда из настроек.
+
+    Args:
+        backend: "memory" или "redis"
+    Returns:
+        TokenGenerations: Реестр поколений
+    """
+    if backend == "redis":
+        from redis.asyncio import Redis
+
+        return TokenGenerations(Redis.from_url(config.REDIS_URL))
+    return TokenGenerations()
+
+
+token_generations = build_token_generations(config.TOKEN_REVOCATION_BACKEND)
+
+
+async def revoke_tokens(db: AsyncSession, user_id: int, **values) -> int | None:
+    """
+    Отозвать все выданные токены пользователя и зафиксировать транзакцию.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        user_id: id пользователя
+        values: Поля пользователя, которые меняются вместе с отзывом
+    Returns:
+        int: Новое поколение токенов или None, если пользователь не найден
+    """
+    generation = await db.scalar(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1, **values)
+        .returning(User.token_version)
+    )
+    await db.commit()
+    if generation is not None:
+        await token_generations.publish({user_id: generation})
+    return generation
+
+
+async def revoke_tokens_where(db: AsyncSession, conditions: list, **values) -> list:
+    """
+    Изменить пользователей по условию одним запросом и отозвать их токены.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        conditions: Условия WHERE для таблицы users
+        values: Поля пользователей, которые меняются вместе с отзывом
+    Returns:
+        list: Измененные пользователи
+    """
+    users = (
+        await db.scalars(
+            update(User)
+            .where(*conditions)
+            .values(token_version=User.token_version + 1, **values)
+            .returning(User)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    await db.commit()
+    await token_generations.publish({user.id: user.token_version for user in users})
+    return users
+
+
+async def sync_token_generations_forever():
+    """
+    Фоновая задача приложения: загрузить поколения из базы данных и
+    периодически синхронизировать их с другими воркерами.
+    """
+    try:
+        async with async_session_maker() as session:
+            await token_generations.load(session)
+    except Exception as ex:
+        logger.error(f"Token generations load failed: {ex}")
+    while True:
+        try:
+            await token_generations.sync()
+        except Exception as ex:
+            logger.error(f"Token generations sync failed: {ex}")
+        await asyncio.sleep(config.TOKEN_REVOCATION_SYNC_INTERVAL)
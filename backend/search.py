@@ -0,0 +1,91 @@
+from sqlalchemy import DDL, Float, column, event, func, literal_column, table
+
+from models.products import Product
+
+SEARCH_CONFIG = "russian"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEX = "ix_products_search_vector"
+
+# Сгенерированная колонка tsvector и GIN индекс. Их нет в модели Product, чтобы
+# схема создавалась и в SQLite; в рабочей базе их создает миграция из этих же
+# выражений, а migrations/env.py исключает их из autogenerate.
+POSTGRES_DDL = [
+    f"""
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX} "
+    f"ON products USING gin ({SEARCH_VECTOR_COLUMN})",
+]
+
+# Запасной вариант для SQLite: внешняя FTS5 таблица поверх products,
+# синхронизируемая триггерами.
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description, content='products', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(
+        Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_DDL:
+    event.listen(
+        Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+
+products_fts = table("products_fts", column("rowid"), column("products_fts"))
+
+
+def _fts5_query(q: str) -> str:
+    """
+    Экранировать пользовательский запрос для MATCH: каждое слово берется в кавычки.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in q.split())
+
+
+def product_search(dialect: str, q: str):
+    """
+    Построить условие совпадения и выражение релевантности для поиска продуктов.
+
+    Args:
+        dialect: Имя диалекта базы данных
+        q: Поисковый запрос
+    Returns:
+        tuple: Присоединяемая таблица или None, условие совпадения, релевантность
+    """
+    if dialect == "sqlite":
+        match = products_fts.c.products_fts.op("MATCH")(_fts5_query(q))
+        rank = -func.bm25(literal_column("products_fts"), type_=Float)
+        return products_fts, match, rank
+
+    search_vector = literal_column(f"products.{SEARCH_VECTOR_COLUMN}")
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(search_vector, ts_query, type_=Float)
+    return None, search_vector.op("@@")(ts_query), rank
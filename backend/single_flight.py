@@ -0,0 +1,119 @@
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request
+from pydantic import TypeAdapter
+
+import config
+from backend.db_depends import wants_primary
+
+
+class _LeaderCancelled(Exception):
+    """Запрос, выполнявший вычисление, был отменен до получения результата."""
+
+
+def _fail(future: asyncio.Future, ex: Exception):
+    future.set_exception(ex)
+    # Исключение уже получил первый запрос: без ожидающих asyncio не должен
+    # сообщать о неполученном исключении.
+    future.exception()
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных запросов на чтение.
+
+    Первый запрос с ключом выполняет вычисление, остальные ждут его результат
+    и не открывают соединение с базой данных. Если первый запрос отменен
+    (клиент отключился), ожидающие выполняют вычисление сами.
+    """
+
+    def __init__(self, routes: set[str]):
+        self.routes = routes
+        self.executed: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+        self._calls: dict[tuple, asyncio.Future] = {}
+
+    async def do(self, route: str, key: tuple, compute: Callable[[], Awaitable[Any]]):
+        """
+        Выполнить вычисление или дождаться такого же, уже начатого.
+
+        Args:
+            route: Имя маршрута, по нему включается объединение
+            key: Параметры запроса, определяющие результат
+            compute: Асинхронная функция без аргументов
+        Returns:
+            Результат вычисления
+        """
+        if route not in self.routes:
+            return await compute()
+
+        call_key = (route, *key)
+        future = self._calls.get(call_key)
+        if future is not None:
+            self.coalesced[route] += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                self.coalesced[route] -= 1
+                return await self.do(route, key, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[call_key] = future
+        self.executed[route] += 1
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            _fail(future, _LeaderCancelled())
+            raise
+        except Exception as ex:
+            _fail(future, ex)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[call_key]
+
+    def stats(self) -> dict:
+        """
+        Получить счетчики по маршрутам.
+
+        Returns:
+            dict: Число выполненных и объединенных запросов по маршрутам
+        """
+        return {
+            route: {"executed": self.executed[route], "coalesced": self.coalesced[route]}
+            for route in self.routes
+        }
+
+
+def request_key(request: Request) -> tuple:
+    """
+    Ключ запроса для объединения: путь, параметры и выбор базы данных.
+    """
+    return request.url.path, request.url.query, wants_primary(request)
+
+
+_adapters: dict[Any, TypeAdapter] = {}
+
+
+def serialize(schema, value, **options) -> bytes:
+    """
+    Сериализовать ответ по схеме один раз, чтобы отдать байты всем ожидающим.
+
+    Args:
+        schema: Тип ответа, как в response_model
+        value: Данные ответа, в том числе объекты ORM
+        options: Параметры dump_json, например exclude_unset
+    Returns:
+        bytes: Тело ответа в JSON
+    """
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True), **options)
+
+
+single_flight = SingleFlight(set(config.SINGLE_FLIGHT_ROUTES))
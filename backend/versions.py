@@ -0,0 +1,183 @@
+import hashlib
+import os
+from collections import defaultdict
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import HTTPException, Request, Response, status
+
+import config
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def content_digest(*paths) -> str:
+    """
+    Хэш содержимого файлов для ETag ответов, которые от них зависят.
+
+    Args:
+        paths: Пути к файлам
+    Returns:
+        str: Шестнадцатеричный хэш
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def _source_files() -> list[Path]:
+    files = []
+    for directory, dirnames, filenames in os.walk(PROJECT_ROOT):
+        dirnames[:] = sorted(
+            name for name in dirnames if not name.startswith(".") and name != "__pycache__"
+        )
+        in_templates = Path(directory).relative_to(PROJECT_ROOT).parts[:1] == ("templates",)
+        files.extend(
+            Path(directory) / name
+            for name in sorted(filenames)
+            if in_templates or name.endswith(".py")
+        )
+    return files
+
+
+# Идентификатор сборки: BUILD_ID из настроек или хэш исходников и шаблонов.
+# Меняется при каждом деплое, поэтому ответы в новом формате не совпадут со
+# старыми ETag, даже если счетчики версий остались прежними.
+BUILD_ID = config.BUILD_ID or content_digest(*_source_files())
+
+
+class ResourceVersions:
+    """
+    Счетчики версий ресурсов, которые увеличивают эндпоинты записи.
+
+    Без store счетчики живут в памяти процесса, и этот вариант годится только
+    для одного воркера: воркер, не обработавший запись, продолжил бы отвечать
+    304 со старыми данными. С Redis счетчики общие для всех воркеров и
+    увеличиваются командой INCR.
+
+    В ETag входят BUILD_ID, который меняется при деплое, и поколение
+    счетчиков: в памяти это идентификатор запуска процесса, в Redis - ключ,
+    который создается заново после очистки Redis.
+    """
+
+    prefix = "resource_version:"
+
+    def __init__(self, store=None):
+        self.store = store
+        self.boot_id = uuid4().hex[:8]
+        self._versions: defaultdict[str, int] = defaultdict(int)
+
+    async def bump(self, *resources: str):
+        """
+        Отметить, что ресурсы изменились.
+
+        Args:
+            resources: Имена ресурсов
+        """
+        if self.store is None:
+            for resource in resources:
+                self._versions[resource] += 1
+            return
+        async with self.store.pipeline(transaction=False) as pipe:
+            for resource in resources:
+                pipe.incr(self.prefix + resource)
+            await pipe.execute()
+
+    async def current(self, *resources: str) -> tuple:
+        """
+        Получить текущие версии ресурсов.
+
+        Args:
+            resources: Имена ресурсов
+        Returns:
+            tuple: Поколение счетчиков и версии ресурсов, меняется при любой записи
+        """
+        if self.store is None:
+            return (self.boot_id, *(self._versions[resource] for resource in resources))
+
+        epoch_key = self.prefix + "epoch"
+        epoch, *versions = await self.store.mget(
+            epoch_key, *(self.prefix + resource for resource in resources)
+        )
+        if epoch is None:
+            if not await self.store.set(epoch_key, self.boot_id, nx=True):
+                epoch = await self.store.get(epoch_key)
+            else:
+                epoch = self.boot_id
+        if isinstance(epoch, bytes):
+            epoch = epoch.decode()
+        return (epoch, *(int(version or 0) for version in versions))
+
+    async def etag(
+        self, request: Request, resources: tuple[str, ...], content: str = ""
+    ) -> str:
+        """
+        Построить сильный ETag из сборки, версий ресурсов и адреса запроса.
+
+        Args:
+            request: Объект запроса
+            resources: Имена ресурсов, от которых зависит ответ
+            content: Хэш файлов, от которых зависит ответ, например шаблона
+        Returns:
+            str: Значение заголовка ETag
+        """
+        versions = "-".join(str(part) for part in await self.current(*resources))
+        request_digest = hashlib.blake2b(
+            f"{request.url.path}?{request.url.query}#{content}".encode(), digest_size=8
+        ).hexdigest()
+        return f'"{BUILD_ID}-{versions}-{request_digest}"'
+
+
+def build_resource_versions(backend: str) -> ResourceVersions:
+    """
+    Создать счетчики версий по имени бэкенда из настроек.
+
+    Args:
+        backend: "memory" (только один воркер) или "redis"
+    Returns:
+        ResourceVersions: Счетчики версий
+    """
+    if backend == "redis":
+        from redis.asyncio import Redis
+
+        return ResourceVersions(Redis.from_url(config.REDIS_URL))
+    return ResourceVersions()
+
+
+resource_versions = build_resource_versions(config.RESOURCE_VERSIONS_BACKEND)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def etag_guard(*resources: str, content: str = ""):
+    """
+    Зависимость, отвечающая 304 Not Modified, если версии ресурсов не менялись.
+
+    Проверка выполняется до обращения к базе данных и сериализации ответа.
+    Эндпоинты с этой зависимостью читают с основной базы данных: версия
+    увеличивается сразу после записи, и отстающая реплика отдала бы старые
+    данные под новым ETag.
+
+    Args:
+        resources: Имена ресурсов, от которых зависит ответ
+        content: Хэш файлов, от которых зависит ответ, например шаблона
+    Returns:
+        Функция зависимости для Depends
+    """
+
+    async def check_etag(request: Request, response: Response):
+        etag = await resource_versions.etag(request, resources, content)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+        response.headers["ETag"] = etag
+
+    return check_etag
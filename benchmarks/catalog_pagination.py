@@ -0,0 +1,102 @@
+"""
+Регрессионная проверка пагинации витрины по курсору.
+
+Приложение запускается в процессе поверх SQLite. У части продуктов нет цены
+или рейтинга, у части значения совпадают. Для каждой сортировки выдача
+проходится по курсору страницами по --limit продуктов и сравнивается с
+выдачей без пагинации. Скрипт завершается с кодом 1, если страницы потеряли
+или повторили продукты или порядок отличается.
+
+    python -m benchmarks.catalog_pagination --products 200 --limit 7
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.db import Base
+from backend.db_depends import get_db, get_read_db, get_session_factory
+from main import app, app_v1
+from models import Category, Product
+from schemas import ProductSort
+
+
+async def setup_database(url: str, products: int):
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    app_v1.dependency_overrides[get_db] = override_get_db
+    app_v1.dependency_overrides[get_read_db] = override_get_db
+    app_v1.dependency_overrides[get_session_factory] = lambda: session_maker
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Category).values(name="Bench", slug="bench"))
+        await conn.execute(
+            insert(Product),
+            [
+                {"name": f"Product {i}", "slug": f"product-{i}",
+                 "price": None if i % 5 == 0 else i % 13,
+                 "rating": None if i % 3 == 0 else (i % 7) / 2,
+                 "category_id": 1, "stock": 10, "is_activate": True}
+                for i in range(products)
+            ],
+        )
+    return engine
+
+
+async def walk(client: httpx.AsyncClient, path: str, sort: str, limit: int) -> list[int]:
+    ids = []
+    params = {"sort": sort, "limit": limit}
+    while True:
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+        page = response.json()
+        ids.extend(product["id"] for product in page["items"])
+        if not page["next_cursor"]:
+            return ids
+        params["cursor"] = page["next_cursor"]
+
+
+async def main(args) -> int:
+    failed = []
+    with tempfile.TemporaryDirectory() as directory:
+        engine = await setup_database(
+            f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}", args.products
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ("/v1/products/", "/v1/products/bench"):
+                for sort in ProductSort:
+                    response = await client.get(
+                        path, params={"sort": sort.value, "paginate": False}
+                    )
+                    expected = [product["id"] for product in response.json()]
+                    ids = await walk(client, path, sort.value, args.limit)
+                    status = "ok" if ids == expected else (
+                        f"FAILED: {len(ids)} of {len(expected)} products"
+                    )
+                    print(f"{path:<20} sort={sort.value:<8} {status}")
+                    if ids != expected:
+                        failed.append(f"{path} sort={sort.value}")
+        await engine.dispose()
+
+    if failed:
+        print(f"Broken pagination in: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,151 @@
+"""
+Задержка GET /v1/products/ во время волны логинов.
+
+Приложение запускается в процессе поверх SQLite. Пока пробник последовательно
+запрашивает каталог, параллельно выполняются сотни POST /v1/auth/token.
+Режим inline воспроизводит старое поведение (bcrypt в цикле событий),
+режим pool использует пул хэширования паролей. Все логины идут от одного
+пользователя с одного адреса, поэтому лимиты частоты входа (AUTH_RATE_LIMIT_*)
+на время бенчмарка сняты, а очередь пула не меньше --concurrency.
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import config
+from backend.db import Base
+from backend.db_depends import get_db, get_read_db, get_session_factory
+from backend.passwords import password_hasher
+from main import app, app_v1
+from models import Category, Product
+from models.users import User
+
+
+async def setup_database(url: str):
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    app_v1.dependency_overrides[get_db] = override_get_db
+    app_v1.dependency_overrides[get_read_db] = override_get_db
+    app_v1.dependency_overrides[get_session_factory] = lambda: session_maker
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User).values(
+                username="storm",
+                email="storm@example.com",
+                hashed_password=password_hasher.context.hash("password"),
+            )
+        )
+        await conn.execute(insert(Category).values(name="Bench", slug="bench"))
+        await conn.execute(
+            insert(Product),
+            [
+                {"name": f"Product {i}", "slug": f"product-{i}", "price": i,
+                 "category_id": 1, "stock": 10, "rating": 0.0, "is_activate": True}
+                for i in range(100)
+            ],
+        )
+    return engine
+
+
+def percentiles(latencies: list[float]) -> str:
+    latencies = sorted(latencies)
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    return (
+        f"n={len(latencies):<5} p50={statistics.median(latencies) * 1000:7.2f}ms "
+        f"p99={p99 * 1000:7.2f}ms max={latencies[-1] * 1000:7.2f}ms"
+    )
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/v1/products/")
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200
+
+
+async def storm(client: httpx.AsyncClient, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            response = await client.post(
+                "/v1/auth/token", data={"username": "storm", "password": "password"}
+            )
+            assert response.status_code == 200
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def run(client: httpx.AsyncClient, args, mode: str):
+    if mode == "inline":
+        async def verify(password, hashed_password):
+            return password_hasher.context.verify(password, hashed_password)
+
+        password_hasher.verify = verify
+    else:
+        password_hasher.__dict__.pop("verify", None)
+
+    stop = asyncio.Event()
+    baseline = []
+    task = asyncio.create_task(probe(client, stop, baseline))
+    await asyncio.sleep(args.baseline)
+    stop.set()
+    await task
+
+    stop = asyncio.Event()
+    during = []
+    task = asyncio.create_task(probe(client, stop, during))
+    started = time.perf_counter()
+    await storm(client, args.logins, args.concurrency)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await task
+
+    print(f"[{mode}] baseline     {percentiles(baseline)}")
+    print(f"[{mode}] login storm  {percentiles(during)}  ({args.logins} logins in {elapsed:.2f}s)")
+
+
+def lift_auth_limits(concurrency: int):
+    config.AUTH_RATE_LIMIT_PER_IP = sys.maxsize
+    config.AUTH_RATE_LIMIT_PER_USERNAME = sys.maxsize
+    config.PASSWORD_HASH_MAX_QUEUE = max(config.PASSWORD_HASH_MAX_QUEUE, concurrency)
+
+
+async def main(args):
+    lift_auth_limits(args.concurrency)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = await setup_database(
+            f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for mode in args.modes:
+                await run(client, args, mode)
+        print(f"hasher stats: {password_hasher.stats()}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--baseline", type=float, default=2.0)
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"])
+    asyncio.run(main(parser.parse_args()))
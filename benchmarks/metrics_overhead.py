@@ -0,0 +1,112 @@
+"""
+Накладные расходы MetricsMiddleware на один запрос.
+
+Минимальное приложение FastAPI вызывается напрямую через ASGI, без сети и
+HTTP клиента, чтобы разница во времени определялась только middleware.
+Режимы: bare - без middleware, metrics - MetricsMiddleware, logline - строка
+в лог на каждый запрос, как делал прежний TimingMiddleware.
+
+    python -m benchmarks.metrics_overhead --requests 10000 --rounds 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fastapi import FastAPI
+from loguru import logger
+
+from backend.metrics import HTTPMetrics
+from middleware import MetricsMiddleware
+
+
+class LogLineMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        start_time = time.time()
+        await self.app(scope, receive, send)
+        duration = time.time() - start_time
+        logger.info(f"Время выполнения запроса: {duration:.4f} секунд")
+
+
+def build_app(mode: str, metrics: HTTPMetrics):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if mode == "metrics":
+        app.add_middleware(MetricsMiddleware, metrics=metrics)
+    elif mode == "logline":
+        app.add_middleware(LogLineMiddleware)
+    return app
+
+
+async def call(app, item_id: int):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/items/{item_id}",
+        "raw_path": f"/items/{item_id}".encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, requests: int) -> float:
+    started = time.perf_counter()
+    for item_id in range(requests):
+        await call(app, item_id)
+    return (time.perf_counter() - started) / requests
+
+
+async def main(args):
+    logger.remove()
+    with tempfile.TemporaryDirectory() as directory:
+        logger.add(os.path.join(directory, "bench.log"), level="INFO", enqueue=True)
+        metrics = HTTPMetrics()
+        apps = {mode: build_app(mode, metrics) for mode in args.modes}
+        for app in apps.values():
+            await measure(app, 1000)
+
+        # Режимы чередуются по раундам, берется лучший результат каждого.
+        results = {mode: float("inf") for mode in args.modes}
+        for _ in range(args.rounds):
+            for mode, app in apps.items():
+                results[mode] = min(results[mode], await measure(app, args.requests))
+        await logger.complete()
+
+    started = time.perf_counter()
+    text = metrics.render()
+    print(f"render: {len(text.splitlines())} lines in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+    bare = results.get("bare")
+    for mode, per_request in results.items():
+        overhead = f"  overhead {(per_request - bare) * 1e6:+6.1f}us" if bare else ""
+        print(f"[{mode:>7}] {per_request * 1e6:7.1f}us/request{overhead}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=["bare", "metrics", "logline"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Сравнение скорости сериализации списка продуктов.
+
+before: ORM объекты без response_model, как раньше: jsonable_encoder и JSONResponse.
+after: response_model ProductOut (from_attributes) и ORJSONResponse.
+
+    python -m benchmarks.serialization --products 10000
+"""
+import argparse
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from models import Product
+from responses import ORJSONResponse
+from schemas import ProductOut
+
+
+def make_products(count: int) -> list[Product]:
+    return [
+        Product(
+            id=index,
+            name=f"Product {index}",
+            slug=f"product-{index}",
+            description="Описание товара " * 5,
+            price=index % 10000,
+            image_url=f"https://example.com/{index}.png",
+            supplier_id=index % 100 or None,
+            category_id=index % 50,
+            stock=index % 30,
+            rating=(index % 100) / 10,
+            is_activate=True,
+        )
+        for index in range(count)
+    ]
+
+
+def before(products: list[Product]) -> bytes:
+    return JSONResponse(jsonable_encoder(products)).body
+
+
+def after(adapter: TypeAdapter, products: list[Product]) -> bytes:
+    # Тот же путь, что у FastAPI с response_model: валидация по атрибутам и dump в JSON режим.
+    content = adapter.dump_python(adapter.validate_python(products), mode="json")
+    return ORJSONResponse(content).body
+
+
+def main(args):
+    products = make_products(args.products)
+    adapter = TypeAdapter(list[ProductOut])
+    assert len(before(products)) and len(after(adapter, products))
+
+    results = {}
+    for name, func in (
+        ("before", lambda: before(products)),
+        ("after", lambda: after(adapter, products)),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        results[name] = best
+        print(
+            f"{name:<7} {best * 1000:>9.2f} ms  "
+            f"{args.products / best:>12,.0f} products/s"
+        )
+    print(f"speedup {results['before'] / results['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,72 @@
+"""
+Пропускная способность аутентифицированных запросов с кэшем токенов и без него.
+
+Приложение запускается в процессе, клиенты параллельно запрашивают
+GET /v1/auth/read_current_user с одним и тем же токеном. В режиме off кэш
+заменяется пустым, и каждый запрос заново проверяет подпись JWT. Отдельно
+измеряется стоимость самой зависимости get_current_user без HTTP стека.
+
+    python -m benchmarks.token_cache --requests 20000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+import httpx
+
+import routers.auth as auth
+from backend.cache import LRUCache
+from main import app
+
+
+async def run(client: httpx.AsyncClient, token: str, args, mode: str):
+    if mode == "off":
+        auth.token_cache = LRUCache(maxsize=0, ttl=0)
+    else:
+        auth.token_cache = LRUCache(maxsize=args.cache_size, ttl=0)
+
+    headers = {"Authorization": f"Bearer {token}"}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def request():
+        async with semaphore:
+            response = await client.get("/v1/auth/read_current_user", headers=headers)
+            assert response.status_code == 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    stats = auth.token_cache.stats()
+
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        await auth.get_current_user(token)
+    per_call = (time.perf_counter() - started) / args.requests
+
+    print(
+        f"[{mode:>3}] {args.requests / elapsed:9.0f} req/s  "
+        f"get_current_user={per_call * 1e6:6.1f}us  "
+        f"hit_rate={stats['hit_rate']:.3f} hits={stats['hits']} misses={stats['misses']}"
+    )
+
+
+async def main(args):
+    token = await auth.create_access_token(
+        "bench", 1, is_admin=False, is_supplier=False, is_customer=True,
+        expires_delta=timedelta(minutes=20),
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in args.modes:
+            await run(client, token, args, mode)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cache-size", type=int, default=10000)
+    parser.add_argument("--modes", nargs="+", default=["off", "on"])
+    asyncio.run(main(parser.parse_args()))
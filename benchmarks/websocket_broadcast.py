@@ -0,0 +1,124 @@
+"""
+Рассылка сообщений по вебсокетам: последовательная отправка против очередей.
+
+Соединения заменены объектами в памяти процесса с методами accept и
+send_text. Часть клиентов медленные: каждая отправка им занимает
+--slow-delay секунд. Измеряется время вызова broadcast и время, за которое
+все быстрые клиенты получили все сообщения. Режим sequential повторяет
+прежний ConnectionManager: await send_text по очереди для каждого соединения.
+
+    python -m benchmarks.websocket_broadcast --connections 10000 --messages 20 --slow 10
+"""
+import argparse
+import asyncio
+import time
+from contextlib import suppress
+
+from loguru import logger
+
+from websocket import DISCONNECT, DROP_OLDEST, ConnectionManager
+
+
+class FakeWebSocket:
+    client = ("bench", 0)
+
+    def __init__(self, delay: float, delivered: "Delivered"):
+        self.delay = delay
+        self.delivered = delivered
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+            self.delivered.add()
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+class Delivered:
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.count = 0
+        self.done = asyncio.Event()
+
+    def add(self):
+        self.count += 1
+        if self.count >= self.expected:
+            self.done.set()
+
+
+class SequentialManager:
+    def __init__(self):
+        self.connections = []
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.connections.append(websocket)
+
+    async def broadcast(self, data: str):
+        for connection in self.connections:
+            await connection.send_text(data)
+
+
+async def run(mode: str, args):
+    fast = args.connections - args.slow
+    delivered = Delivered(fast * args.messages)
+    if mode == "sequential":
+        manager = SequentialManager()
+    else:
+        manager = ConnectionManager(queue_size=args.queue_size, policy=mode)
+
+    for number in range(args.connections):
+        delay = args.slow_delay if number < args.slow else 0
+        await manager.connect(FakeWebSocket(delay, delivered))
+
+    broadcast_time = 0.0
+    started = time.perf_counter()
+    for number in range(args.messages):
+        call_started = time.perf_counter()
+        await manager.broadcast(f"message {number}")
+        broadcast_time += time.perf_counter() - call_started
+        # Между сообщениями цикл событий запускает задачи отправки, как при
+        # обычном потоке сообщений от клиентов.
+        await asyncio.sleep(0)
+    with suppress(TimeoutError):
+        await asyncio.wait_for(delivered.done.wait(), args.timeout)
+    elapsed = time.perf_counter() - started
+
+    stats = {}
+    if isinstance(manager, ConnectionManager):
+        stats = manager.stats()
+        for connection in list(manager.connections):
+            manager.disconnect(connection)
+        await asyncio.sleep(0)
+
+    print(
+        f"[{mode:>11}] broadcast={broadcast_time / args.messages * 1000:8.2f}ms/msg  "
+        f"fast clients got {delivered.count / delivered.expected:6.1%} in {elapsed * 1000:8.1f}ms  "
+        f"dropped={stats.get('dropped', 0)} disconnected={stats.get('disconnected', 0)}"
+    )
+
+
+async def main(args):
+    logger.remove()
+    for mode in args.modes:
+        await run(mode, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=10)
+    parser.add_argument("--slow-delay", type=float, default=0.01)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument(
+        "--modes", nargs="+", default=["sequential", DROP_OLDEST, DISCONNECT]
+    )
+    asyncio.run(main(parser.parse_args()))
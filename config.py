@@ -11,5 +11,59 @@ DB_PORT = os.getenv("DB_PORT")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_RETRY_INTERVAL = float(os.getenv("DB_REPLICA_RETRY_INTERVAL", 30))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
 SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
\ No newline at end of file
+ALGORITHM = os.getenv("ALGORITHM")
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+PRODUCT_CACHE_BACKEND = os.getenv("PRODUCT_CACHE_BACKEND", "memory")
+PRODUCT_CACHE_SIZE = int(os.getenv("PRODUCT_CACHE_SIZE", 10000))
+PRODUCT_CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", 60))
+
+RESOURCE_VERSIONS_BACKEND = os.getenv("RESOURCE_VERSIONS_BACKEND", "memory")
+BUILD_ID = os.getenv("BUILD_ID", "")
+
+RESERVATION_TTL_MINUTES = int(os.getenv("RESERVATION_TTL_MINUTES", 15))
+RESERVATION_EXPIRY_INTERVAL = float(os.getenv("RESERVATION_EXPIRY_INTERVAL", 30))
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 20))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+TOKEN_REVOCATION_BACKEND = os.getenv("TOKEN_REVOCATION_BACKEND", "memory")
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", 1))
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+RATE_LIMIT_PERIOD = float(os.getenv("RATE_LIMIT_PERIOD", 60))
+AUTH_RATE_LIMIT_PER_IP = int(os.getenv("AUTH_RATE_LIMIT_PER_IP", 20))
+AUTH_RATE_LIMIT_PER_USERNAME = int(os.getenv("AUTH_RATE_LIMIT_PER_USERNAME", 5))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 256))
+
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 0))
+
+REQUEST_LOG_PATH = os.getenv("REQUEST_LOG_PATH", "requests.log")
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", 0.1))
+REQUEST_LOG_BATCH_SIZE = int(os.getenv("REQUEST_LOG_BATCH_SIZE", 500))
+REQUEST_LOG_FLUSH_INTERVAL = float(os.getenv("REQUEST_LOG_FLUSH_INTERVAL", 1))
+REQUEST_LOG_QUEUE_SIZE = int(os.getenv("REQUEST_LOG_QUEUE_SIZE", 10000))
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+COMPRESSION_BROTLI_LEVEL = int(os.getenv("COMPRESSION_BROTLI_LEVEL", 5))
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", 64 * 1024 * 1024))
+
+SINGLE_FLIGHT_ROUTES = [
+    route.strip()
+    for route in os.getenv("SINGLE_FLIGHT_ROUTES", "detail_product,product_by_category").split(",")
+    if route.strip()
+]
+
+WEBSOCKET_SEND_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", 64))
+WEBSOCKET_SLOW_CONSUMER_POLICY = os.getenv("WEBSOCKET_SLOW_CONSUMER_POLICY", "drop_oldest")
@@ -1,22 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from celery import Celery
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from starlette.requests import Request
 from starlette.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
 
-from middleware import log_middleware, TimingMiddleware
+from backend.request_log import request_log_writer
+from backend.reservations import expire_reservations_forever
+from backend.revocation import sync_token_generations_forever
+from backend.versions import content_digest, etag_guard, resource_versions
+from middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    RequestLogMiddleware,
+)
+from responses import ORJSONResponse
 from routers import tests
-from routers import reviews, websockets, categories, auth, products, permissions
+from routers import reviews, websockets, categories, auth, products, permissions, orders
+from routers import metrics
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    expiry_task = asyncio.create_task(expire_reservations_forever())
+    revocation_task = asyncio.create_task(sync_token_generations_forever())
+    request_log_writer.start()
+    yield
+    expiry_task.cancel()
+    revocation_task.cancel()
+    await request_log_writer.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 app_v1 = FastAPI(
     title="My API v1",
     description="The first version of my API",
+    default_response_class=ORJSONResponse,
 )
 
 templates = Jinja2Templates(directory="templates")
+INDEX_DIGEST = content_digest("templates/index.html")
 
 logger.add("info.log", format="Log: [{time} - {level} - {message}]", level="INFO", enqueue = True)
 
@@ -32,8 +60,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(TimingMiddleware)
-app.middleware("http")(log_middleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(RequestLogMiddleware)
 
 celery = Celery(
     __name__,
@@ -54,13 +84,23 @@ app_v1.include_router(products.router)
 app_v1.include_router(auth.router)
 app_v1.include_router(permissions.router)
 app_v1.include_router(reviews.router)
+app_v1.include_router(orders.router)
 app_v1.include_router(tests.router)
 app.include_router(websockets.router)
+app.include_router(metrics.router)
 
 app.mount("/v1", app_v1)  # Версионирование
 
 
-@app.get("/", response_class=HTMLResponse)
-def read_index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+@app.get(
+    "/",
+    response_class=HTMLResponse,
+    dependencies=[Depends(etag_guard(content=INDEX_DIGEST))],
+)
+async def read_index(request: Request):
+    return templates.TemplateResponse(
+        request=request,
+        name="index.html",
+        headers={"ETag": await resource_versions.etag(request, (), INDEX_DIGEST)},
+    )
 
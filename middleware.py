@@ -1,37 +1,269 @@
+import os
+import random
 import time
-from uuid import uuid4
 
 from loguru import logger
-from starlette.requests import Request
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import JSONResponse
 
+import config
+from backend.compression import (
+    compressed_cache,
+    create_encoder,
+    is_compressible,
+    negotiate,
+)
+from backend.db import QueryStats, query_stats
+from backend.metrics import HTTPMetrics, http_metrics
+from backend.request_log import request_log_writer
 
-class TimingMiddleware:
+
+def route_template(scope) -> str:
+    """
+    Шаблон маршрута, обработавшего запрос, с префиксом смонтированного приложения.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return scope.get("root_path", "") + route.path
+
+
+class MetricsMiddleware:
+    """
+    Сбор метрик HTTP запросов для эндпоинта /metrics.
+
+    Middleware ничего не пишет в лог: длительность, код ответа и размер тела
+    накапливаются в гистограммах и счетчиках в памяти процесса.
+    """
+
+    def __init__(self, app, metrics: HTTPMetrics = http_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.in_progress[method] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            duration = time.perf_counter() - started
+            self.metrics.in_progress[method] -= 1
+            self.metrics.observe(method, route_template(scope), status_code, duration, size)
+
+
+class CompressionMiddleware:
     """
-    Измерения времени выполнения запроса.
+    Сжатие ответов gzip, zstd или brotli по заголовку Accept-Encoding.
+
+    Ответы меньше minimum_size отдаются как есть, потоковые ответы сжимаются
+    по частям. Сжатые тела успешных GET ответов с ETag сохраняются в
+    compressed_cache, и повторный ответ с тем же ETag не сжимается заново.
     """
+
+    def __init__(self, app, minimum_size: int = config.COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not is_compressible(
+                    headers.get("content-type", "")
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(scope=start_message)
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    passthrough = True
+                    if len(body) >= self.minimum_size:
+                        body = self._compress(scope, start_message, encoding, body)
+                        headers["content-length"] = str(len(body))
+                        self._mark_encoded(headers, encoding)
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                encoder = create_encoder(encoding)
+                del headers["content-length"]
+                self._mark_encoded(headers, encoding)
+                await send(start_message)
+
+            chunk = encoder.compress_chunk(body) if body else b""
+            if not more_body:
+                chunk += encoder.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compress(scope, start_message, encoding: str, body: bytes) -> bytes:
+        etag = Headers(raw=start_message["headers"]).get("etag")
+        cacheable = etag and scope["method"] == "GET" and start_message["status"] == 200
+        if cacheable:
+            compressed = compressed_cache.get(etag, encoding)
+            if compressed is not None:
+                return compressed
+
+        compressed = create_encoder(encoding).compress(body)
+        if cacheable:
+            compressed_cache.set(etag, encoding, compressed)
+        return compressed
+
+    @staticmethod
+    def _mark_encoded(headers: MutableHeaders, encoding: str):
+        headers["content-encoding"] = encoding
+        # Сжатое тело отличается от исходного побайтно, поэтому ETag становится слабым.
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = "W/" + etag
+
+
+class QueryStatsMiddleware:
+    """
+    Подсчет SQL запросов и времени в базе данных для каждого HTTP запроса.
+
+    Итоги отдаются в заголовке Server-Timing и попадают в журнал запросов
+    через scope["query_stats"]. При SQL_N_PLUS_ONE_THRESHOLD > 0 повторяющиеся
+    одинаковые запросы отмечаются предупреждением.
+    """
+
     def __init__(self, app):
         self.app = app
 
     async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        threshold = config.SQL_N_PLUS_ONE_THRESHOLD
+        stats = QueryStats(track_statements=threshold > 0)
+        token = query_stats.set(stats)
+        scope["query_stats"] = stats
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", stats.server_timing()
+                )
+            await send(message)
+
         try:
-            start_time = time.time()
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            for statement, count in stats.repeated(threshold):
+                logger.warning(
+                    f"Possible N+1 in {scope['method']} {scope['path']}: "
+                    f"{count} identical statements: {statement}"
+                )
+
+
+class RequestLogMiddleware:
+    """
+    Структурный журнал HTTP запросов в формате JSON.
+
+    Ошибки (4xx, 5xx и исключения) пишутся всегда, успешные ответы - с
+    вероятностью REQUEST_LOG_SAMPLE_RATE. Запись только ставится в очередь,
+    в файл ее пишет фоновая задача request_log_writer. Необработанное
+    исключение записывается в журнал и превращается в ответ 500.
+    """
+
+    def __init__(self, app, sample_rate: float = config.REQUEST_LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
             await self.app(scope, receive, send)
-            duration = time.time() - start_time
-            logger.info(f"Время выполнения запроса: {duration:.4f} секунд")
-        except KeyError:
-            pass
-
-async def log_middleware(request: Request, call_next):
-    log_id = str(uuid4())
-    with logger.contextualize(log_id=log_id):
+            return
+
+        status_code = 500
+        response_started = False
+        error = None
+
+        async def send_with_status(message):
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+            await send(message)
+
+        started = time.perf_counter()
         try:
-            response = await call_next(request)
-            if response.status_code in [401, 402, 403, 404]:
-                logger.warning(f"Request to {request.url.path} failed")
-            else:
-                logger.info('Successfully accessed ' + request.url.path)
+            await self.app(scope, receive, send_with_status)
         except Exception as ex:
-            logger.error(f"Request to {request.url.path} failed: {ex}")
-            response = JSONResponse(content={"success": False}, status_code=500)
-        return response
\ No newline at end of file
+            # Ошибка попадает в журнал. Если ответ 500 уже отправлен вложенным
+            # приложением, второй ответ не нужен.
+            error = repr(ex)
+            status_code = 500
+            if not response_started:
+                response = JSONResponse(content={"success": False}, status_code=500)
+                await response(scope, receive, send)
+        finally:
+            if status_code >= 400 or random.random() < self.sample_rate:
+                request_log_writer.submit(
+                    self._record(scope, status_code, time.perf_counter() - started, error)
+                )
+
+    @staticmethod
+    def _record(scope, status_code: int, duration: float, error: str | None) -> dict:
+        record = {
+            "time": time.time(),
+            "level": "error" if status_code >= 500 else "warning" if status_code >= 400 else "info",
+            "request_id": Headers(scope=scope).get("x-request-id") or os.urandom(8).hex(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route_template(scope),
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "client": scope["client"][0] if scope.get("client") else None,
+        }
+        stats = scope.get("query_stats")
+        if stats is not None:
+            record["db_queries"] = stats.count
+            record["db_time_ms"] = round(stats.duration * 1000, 3)
+        if error is not None:
+            record["error"] = error
+        return record
@@ -8,11 +8,13 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 from backend.db import Base
+from backend.search import SEARCH_VECTOR_COLUMN, SEARCH_VECTOR_INDEX
 from config import DATABASE_URL
 from models.categories import Category
 from models.users import User
-from models.reviews import Review
+from models.reviews import Review, ProductGradeCount
 from models.products import Product
+from models.orders import Order, OrderItem
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,6 +34,18 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Объекты полнотекстового поиска создаются DDL из backend/search.py и не
+# описаны в моделях, autogenerate не должен предлагать их удалить.
+EXCLUDED_OBJECTS = {
+    ("column", SEARCH_VECTOR_COLUMN),
+    ("index", SEARCH_VECTOR_INDEX),
+}
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    return (type_, name) not in EXCLUDED_OBJECTS
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -54,6 +68,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -63,7 +78,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,43 @@
+"""review listing indexes
+
+Revision ID: 0a5c9e3b7d61
+Revises: b86d4e0a9f52
+Create Date: 2026-10-18 15:31:40.228953
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a5c9e3b7d61'
+down_revision: Union[str, None] = 'b86d4e0a9f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_reviews_product_active_comment_date',
+        'reviews',
+        ['product_id', 'is_active', 'comment_date', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_reviews_active_comment_date',
+        'reviews',
+        ['comment_date', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_active = true'),
+    )
+    op.drop_index(op.f('ix_reviews_product_id'), table_name='reviews')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_reviews_product_id'), 'reviews', ['product_id'], unique=False)
+    op.drop_index('ix_reviews_active_comment_date', table_name='reviews')
+    op.drop_index('ix_reviews_product_active_comment_date', table_name='reviews')
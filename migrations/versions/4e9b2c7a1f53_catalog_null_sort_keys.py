@@ -0,0 +1,58 @@
+"""catalog null sort keys
+
+Revision ID: 4e9b2c7a1f53
+Revises: c41f7b2e8a96
+Create Date: 2026-10-18 14:02:37.118254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e9b2c7a1f53'
+down_revision: Union[str, None] = 'c41f7b2e8a96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_products_catalog_rating', table_name='products')
+    op.drop_index('ix_products_catalog_price', table_name='products')
+    op.create_index(
+        'ix_products_catalog_price',
+        'products',
+        [sa.text('coalesce(price, -1)'), 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
+    op.create_index(
+        'ix_products_catalog_rating',
+        'products',
+        [sa.text('coalesce(rating, -1)'), 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_catalog_rating', table_name='products')
+    op.drop_index('ix_products_catalog_price', table_name='products')
+    op.create_index(
+        'ix_products_catalog_price',
+        'products',
+        ['price', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
+    op.create_index(
+        'ix_products_catalog_rating',
+        'products',
+        ['rating', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
@@ -0,0 +1,31 @@
+"""product search vector
+
+Revision ID: 5b7e2d9a41c3
+Revises: 13549cc57801
+Create Date: 2026-10-18 11:20:04.183512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from backend.search import POSTGRES_DDL, SEARCH_VECTOR_COLUMN, SEARCH_VECTOR_INDEX
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2d9a41c3'
+down_revision: Union[str, None] = '13549cc57801'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in POSTGRES_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(SEARCH_VECTOR_INDEX, table_name='products', postgresql_using='gin')
+    op.drop_column('products', SEARCH_VECTOR_COLUMN)
@@ -0,0 +1,28 @@
+"""user token version
+
+Revision ID: 7d3a1c9e5b20
+Revises: 0a5c9e3b7d61
+Create Date: 2026-10-18 16:12:05.417382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3a1c9e5b20'
+down_revision: Union[str, None] = '0a5c9e3b7d61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,48 @@
+"""catalog indexes
+
+Revision ID: 9c4a6e1f0d28
+Revises: 5b7e2d9a41c3
+Create Date: 2026-10-18 12:05:41.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4a6e1f0d28'
+down_revision: Union[str, None] = '5b7e2d9a41c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_products_catalog_id',
+        'products',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
+    op.create_index(
+        'ix_products_catalog_category_id',
+        'products',
+        ['category_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
+    op.create_index(op.f('ix_categories_parent_id'), 'categories', ['parent_id'], unique=False)
+    op.create_index(op.f('ix_reviews_product_id'), 'reviews', ['product_id'], unique=False)
+    op.create_index(op.f('ix_reviews_user_id'), 'reviews', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reviews_user_id'), table_name='reviews')
+    op.drop_index(op.f('ix_reviews_product_id'), table_name='reviews')
+    op.drop_index(op.f('ix_categories_parent_id'), table_name='categories')
+    op.drop_index('ix_products_catalog_category_id', table_name='products')
+    op.drop_index('ix_products_catalog_id', table_name='products')
@@ -0,0 +1,63 @@
+"""rating aggregates
+
+Revision ID: b86d4e0a9f52
+Revises: 3f0b8c5d7e14
+Create Date: 2026-10-18 14:48:17.306721
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b86d4e0a9f52'
+down_revision: Union[str, None] = '3f0b8c5d7e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('review_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('products', sa.Column('grade_sum', sa.Integer(), server_default='0', nullable=True))
+    op.create_table('product_grade_counts',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('grade', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'grade')
+    )
+    # Заполнение агрегатов по уже существующим активным отзывам.
+    op.execute(
+        """
+        UPDATE products
+        SET review_count = totals.review_count,
+            grade_sum = totals.grade_sum,
+            rating = totals.grade_sum::float / totals.review_count
+        FROM (
+            SELECT product_id, count(*) AS review_count, sum(grade) AS grade_sum
+            FROM reviews
+            WHERE is_active
+            GROUP BY product_id
+        ) AS totals
+        WHERE products.id = totals.product_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO product_grade_counts (product_id, grade, count)
+        SELECT product_id, grade, count(*)
+        FROM reviews
+        WHERE is_active
+        GROUP BY product_id, grade
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_grade_counts')
+    op.drop_column('products', 'grade_sum')
+    op.drop_column('products', 'review_count')
@@ -0,0 +1,33 @@
+"""users username pattern index
+
+Revision ID: c41f7b2e8a96
+Revises: 7d3a1c9e5b20
+Create Date: 2026-10-18 16:47:31.802114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7b2e8a96'
+down_revision: Union[str, None] = '7d3a1c9e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_users_username_pattern',
+        'users',
+        ['username'],
+        unique=False,
+        postgresql_ops={'username': 'text_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_pattern', table_name='users')
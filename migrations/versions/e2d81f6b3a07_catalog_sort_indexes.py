@@ -0,0 +1,44 @@
+"""catalog sort indexes
+
+Revision ID: e2d81f6b3a07
+Revises: 9c4a6e1f0d28
+Create Date: 2026-10-18 13:12:09.517204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d81f6b3a07'
+down_revision: Union[str, None] = '9c4a6e1f0d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_products_catalog_price',
+        'products',
+        ['price', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
+    op.create_index(
+        'ix_products_catalog_rating',
+        'products',
+        ['rating', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_activate = true'),
+    )
+    op.create_index(op.f('ix_products_supplier_id'), 'products', ['supplier_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_products_supplier_id'), table_name='products')
+    op.drop_index('ix_products_catalog_rating', table_name='products')
+    op.drop_index('ix_products_catalog_price', table_name='products')
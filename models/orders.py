@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from backend.db import Base
+
+
+class Order(Base):
+    """Модель заказа с резервированием товара."""
+
+    __tablename__ = "orders"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    status = Column(String, default="reserved")
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime)
+
+    # Фоновая очистка ищет только просроченные резервы.
+    __table_args__ = (
+        Index(
+            "ix_orders_reserved_expires_at",
+            expires_at,
+            postgresql_where=status == "reserved",
+            sqlite_where=status == "reserved",
+        ),
+    )
+
+
+class OrderItem(Base):
+    """Модель позиции заказа."""
+
+    __tablename__ = "order_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    product_id = Column(Integer, ForeignKey("products.id"))
+    quantity = Column(Integer)
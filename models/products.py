@@ -1,8 +1,37 @@
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    literal_column,
+)
 from sqlalchemy.orm import relationship
 
 from backend.db import Base
 
+# Значение ключа сортировки витрины для продуктов без цены или рейтинга.
+NULL_SORT_VALUE = -1
+
+
+def sort_key(column):
+    """
+    Ключ сортировки без NULL для пагинации по курсору.
+
+    Сравнение кортежа (column, id) с NULL в курсоре дает NULL и обрывает
+    выдачу, поэтому NULL заменяется на NULL_SORT_VALUE. Значение подставляется
+    в SQL как есть, чтобы выражение в запросе совпадало с выражением индекса.
+
+    Args:
+        column: Колонка, допускающая NULL
+    Returns:
+        Выражение SQLAlchemy
+    """
+    return func.coalesce(column, literal_column(str(NULL_SORT_VALUE)))
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -13,10 +42,44 @@ class Product(Base):
     description = Column(String)
     price = Column(Integer)
     image_url = Column(String)
-    supplier_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    supplier_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"))
     stock = Column(Integer)
     rating = Column(Float)
+    review_count = Column(Integer, default=0, server_default="0")
+    grade_sum = Column(Integer, default=0, server_default="0")
     is_activate = Column(Boolean, default=True)
 
     category = relationship("Category", back_populates="products")
+
+    # Частичные индексы под фильтр витрины. Условие stock > 0 в предикат не входит:
+    # оно передается параметром, и обобщенный план не смог бы доказать совпадение.
+    __table_args__ = (
+        Index(
+            "ix_products_catalog_id",
+            id,
+            postgresql_where=is_activate == True,
+            sqlite_where=is_activate == True,
+        ),
+        Index(
+            "ix_products_catalog_category_id",
+            category_id,
+            id,
+            postgresql_where=is_activate == True,
+            sqlite_where=is_activate == True,
+        ),
+        Index(
+            "ix_products_catalog_price",
+            sort_key(price),
+            id,
+            postgresql_where=is_activate == True,
+            sqlite_where=is_activate == True,
+        ),
+        Index(
+            "ix_products_catalog_rating",
+            sort_key(rating),
+            id,
+            postgresql_where=is_activate == True,
+            sqlite_where=is_activate == True,
+        ),
+    )
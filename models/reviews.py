@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Index, String
 from backend.db import Base
 
 
@@ -9,9 +9,37 @@ class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     product_id = Column(Integer, ForeignKey("products.id"))
     comment = Column(String, nullable=True)
-    comment_date = Column(DateTime, default=datetime.now())
+    comment_date = Column(DateTime, default=datetime.now)
     grade = Column(Integer)
     is_active = Column(Boolean, default=True)
+
+    # Индексы под выдачу отзывов страницами по (comment_date, id).
+    __table_args__ = (
+        Index(
+            "ix_reviews_product_active_comment_date",
+            product_id,
+            is_active,
+            comment_date,
+            id,
+        ),
+        Index(
+            "ix_reviews_active_comment_date",
+            comment_date,
+            id,
+            postgresql_where=is_active == True,
+            sqlite_where=is_active == True,
+        ),
+    )
+
+
+class ProductGradeCount(Base):
+    """Модель количества активных отзывов продукта с данной оценкой."""
+
+    __tablename__ = "product_grade_counts"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    grade = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0)
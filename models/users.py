@@ -1,10 +1,18 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Index, Integer, String
 
 from backend.db import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Поиск по началу имени пользователя в списке для администратора.
+        Index(
+            "ix_users_username_pattern",
+            "username",
+            postgresql_ops={"username": "text_pattern_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String)
@@ -16,3 +24,4 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     is_supplier = Column(Boolean, default=False)
     is_customer = Column(Boolean, default=True)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
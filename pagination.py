@@ -0,0 +1,116 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Float, Integer, Numeric, String, literal, tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Упаковать значения ключа последней строки страницы в непрозрачный курсор.
+
+    Args:
+        values: Значения колонок ключа сортировки
+    Returns:
+        str: Курсор в формате base64url
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Распаковать курсор, полученный от клиента.
+
+    Args:
+        cursor: Курсор из параметра запроса
+        size: Ожидаемое количество значений в ключе
+    Returns:
+        list: Значения колонок ключа сортировки
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return values
+
+
+def after_cursor(columns: Sequence, values: Sequence, descending: bool = False):
+    """
+    Условие WHERE, отсекающее строки до курсора включительно.
+
+    Args:
+        columns: Колонки ключа сортировки
+        values: Значения ключа из курсора
+        descending: Сортировка по убыванию
+    Returns:
+        Выражение SQLAlchemy для фильтрации
+    """
+    bound = [_bind(column, value) for column, value in zip(columns, values)]
+    if len(columns) == 1:
+        key, value = columns[0], bound[0]
+    else:
+        key, value = tuple_(*columns), tuple_(*bound)
+    return key < value if descending else key > value
+
+
+def _bind(column, value):
+    """
+    Привязать значение из курсора с типом колонки, проверив и приведя его к этому типу.
+    """
+    try:
+        value = _coerce(column.type, value)
+    except (ArithmeticError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return literal(value, type_=column.type)
+
+
+def _coerce(column_type, value):
+    # None приходит из курсоров, выданных для строк с NULL в ключе сортировки.
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise TypeError(value)
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Integer):
+        if not isinstance(value, int):
+            raise TypeError(value)
+        return value
+    if isinstance(column_type, (Float, Numeric)):
+        number = Decimal(str(value))
+        if not number.is_finite():
+            raise ValueError(value)
+        return float(number) if isinstance(column_type, Float) else number
+    if isinstance(column_type, String) and not isinstance(value, str):
+        raise TypeError(value)
+    return value
+
+
+def keyset_page(rows: Sequence, limit: int, key) -> dict:
+    """
+    Сформировать страницу из строк, выбранных с запасом в одну строку.
+
+    Args:
+        rows: Результат запроса с LIMIT limit + 1
+        limit: Размер страницы
+        key: Функция, возвращающая значения ключа сортировки строки
+    Returns:
+        dict: Элементы страницы и курсор следующей страницы
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(key(items[-1])) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
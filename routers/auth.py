@@ -1,25 +1,70 @@
+import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
 import jwt
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from fastapi.params import Depends
 from fastapi.security import HTTPBasic, OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
+from backend.cache import LRUCache
 from backend.db_depends import get_db
+from backend.passwords import password_hasher
+from backend.rate_limit import client_ip, enforce
+from backend.revocation import revoke_tokens, token_generations
 from models.users import User
-from schemas import CreateUser
+from schemas import CreateUser, RefreshToken
 
 SECRET_KEY = config.SECRET_KEY
 ALGORITHM = config.ALGORITHM
 router = APIRouter(prefix="/auth", tags=["auth"])
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBasic()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+# Проверенные токены живут в кэше до своего exp, TTL по умолчанию не используется.
+token_cache = LRUCache(maxsize=config.TOKEN_CACHE_SIZE, ttl=0)
+
+
+def limit_by_ip(scope: str):
+    """
+    Зависимость, ограничивающая частоту запросов к эндпоинту с одного IP.
+
+    Args:
+        scope: Имя эндпоинта в ключе ограничения
+    """
+
+    async def dependency(request: Request):
+        await enforce(
+            f"{scope}:ip:{client_ip(request)}",
+            config.AUTH_RATE_LIMIT_PER_IP,
+            config.RATE_LIMIT_PERIOD,
+        )
+
+    return dependency
+
+
+async def admit_password_check():
+    """
+    Отклонить запрос сразу, если очередь пула хэширования паролей переполнена.
+    """
+    if password_hasher.waiting >= config.PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def limit_login(
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+):
+    await enforce(
+        f"login:username:{form_data.username.lower()}",
+        config.AUTH_RATE_LIMIT_PER_USERNAME,
+        config.RATE_LIMIT_PERIOD,
+    )
 
 
 async def authenticate_user(
@@ -28,7 +73,7 @@ async def authenticate_user(
     user = await db.scalar(select(User).where(User.username == username))
     if (
         not user
-        or not bcrypt_context.verify(password, user.hashed_password)
+        or not await password_hasher.verify(password, user.hashed_password)
         or user.is_active == False
     ):
         raise HTTPException(
@@ -46,6 +91,7 @@ async def create_access_token(
     is_supplier: bool,
     is_customer: bool,
     expires_delta: timedelta,
+    token_version: int = 0,
 ):
     payload = {
         "sub": username,
@@ -53,15 +99,72 @@ async def create_access_token(
         "is_admin": is_admin,
         "is_supplier": is_supplier,
         "is_customer": is_customer,
+        "gen": token_version,
         "exp": datetime.now(timezone.utc) + expires_delta,
     }
     payload["exp"] = int(payload["exp"].timestamp())
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
+async def create_refresh_token(
+    user_id: int, token_version: int, expires_delta: timedelta
+):
+    payload = {
+        "id": user_id,
+        "gen": token_version,
+        "type": "refresh",
+        "exp": int((datetime.now(timezone.utc) + expires_delta).timestamp()),
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+async def issue_tokens(user: User) -> dict:
+    """
+    Выдать пару access и refresh токенов с текущими правами пользователя.
+
+    Args:
+        user: Пользователь из базы данных
+    Returns:
+        dict: Токены для ответа клиенту
+    """
+    access_token = await create_access_token(
+        user.username,
+        user.id,
+        user.is_admin,
+        user.is_supplier,
+        user.is_customer,
+        expires_delta=timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES),
+        token_version=user.token_version,
+    )
+    refresh_token = await create_refresh_token(
+        user.id,
+        user.token_version,
+        expires_delta=timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
+
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    cached = await token_cache.get(token_key)
+    if cached is not None:
+        generation, user = cached
+        if token_generations.is_revoked(user["id"], generation):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked"
+            )
+        return dict(user)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload.get("type") == "refresh":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user"
+            )
         username: str | None = payload.get("sub")
         user_id: int | None = payload.get("id")
         is_admin: bool | None = payload.get("is_admin")
@@ -92,25 +195,39 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired!"
             )
 
-        return {
+        generation = payload.get("gen", 0)
+        if token_generations.is_revoked(user_id, generation):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked"
+            )
+
+        user = {
             "username": username,
             "id": user_id,
             "is_admin": is_admin,
             "is_supplier": is_supplier,
             "is_customer": is_customer,
         }
+        await token_cache.set(
+            token_key, (generation, user), ttl=expire - current_time
+        )
+        return dict(user)
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired!"
         )
-    except jwt.exceptions:
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user"
         )
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip("signup")), Depends(admit_password_check)],
+)
 async def create_user(
     db: Annotated[AsyncSession, Depends(get_db)], create_user: CreateUser
 ):
@@ -120,29 +237,74 @@ async def create_user(
             last_name=create_user.last_name,
             username=create_user.username,
             email=create_user.email,
-            hashed_password=bcrypt_context.hash(create_user.password),
+            hashed_password=await password_hasher.hash(create_user.password),
         )
     )
     await db.commit()
     return {"status_code": status.HTTP_201_CREATED, "transaction": "Successful"}
 
 
-@router.post("/token")
+@router.post(
+    "/token",
+    dependencies=[
+        Depends(limit_by_ip("login")),
+        Depends(limit_login),
+        Depends(admit_password_check),
+    ],
+)
 async def login(
     db: Annotated[AsyncSession, Depends(get_db)],
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ):
     user = await authenticate_user(db, form_data.username, form_data.password)
-    token = await create_access_token(
-        user.username,
-        user.id,
-        user.is_admin,
-        user.is_supplier,
-        user.is_customer,
-        expires_delta=timedelta(minutes=20),
-    )
+    return await issue_tokens(user)
 
-    return {"access_token": token, "token_type": "bearer"}
+
+@router.post("/refresh", dependencies=[Depends(limit_by_ip("refresh"))])
+async def refresh(
+    db: Annotated[AsyncSession, Depends(get_db)], refresh_token: RefreshToken
+):
+    """
+    Обменять refresh токен на новую пару токенов с актуальными правами.
+
+    Старый refresh токен остается действительным до своего exp или до отзыва
+    токенов пользователя.
+    """
+    try:
+        payload = jwt.decode(
+            refresh_token.refresh_token, SECRET_KEY, algorithms=[ALGORITHM]
+        )
+    except jwt.InvalidTokenError:
+        payload = {}
+    user_id = payload.get("id")
+    generation = payload.get("gen", 0)
+    if (
+        payload.get("type") != "refresh"
+        or user_id is None
+        or token_generations.is_revoked(user_id, generation)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user or not user.is_active or user.token_version != generation:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+    return await issue_tokens(user)
+
+
+@router.post("/logout")
+async def logout(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    get_user: Annotated[dict, Depends(get_current_user)],
+):
+    """
+    Отозвать все access и refresh токены текущего пользователя.
+    """
+    await revoke_tokens(db, get_user["id"])
+    return {"status_code": status.HTTP_200_OK, "detail": "Tokens revoked"}
 
 
 @router.get("/read_current_user")
@@ -5,18 +5,24 @@ from slugify import slugify
 from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.db_depends import get_db
+from backend.category_tree import category_tree
+from backend.db_depends import get_db, get_read_db
+from backend.versions import etag_guard, resource_versions
 from models.categories import Category
 from routers.auth import get_current_user
-from schemas import CreateCategory
+from schemas import CategoryOut, CreateCategory
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 
-@router.get("/")
+@router.get(
+    "/",
+    dependencies=[Depends(etag_guard("categories"))],
+    response_model=list[CategoryOut],
+)
 async def all_categories(db: Annotated[AsyncSession, Depends(get_db)]):
-    categories = await db.scalars(select(Category).where(Category.is_active == True))
-    return categories.all()
+    await category_tree.ensure_loaded(db)
+    return category_tree.active()
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -34,6 +40,8 @@ async def create_category(
             )
         )
         await db.commit()
+        await resource_versions.bump("categories")
+        await category_tree.refresh(db)
         return {"status_code": status.HTTP_201_CREATED, "transaction": "Successful"}
     else:
         raise HTTPException(
@@ -42,9 +50,9 @@ async def create_category(
         )
 
 
-@router.get("/detail/{category_slug}")
+@router.get("/detail/{category_slug}", response_model=CategoryOut)
 async def detail_category(
-    db: Annotated[AsyncSession, Depends(get_db)], category_slug: str
+    db: Annotated[AsyncSession, Depends(get_read_db)], category_slug: str
 ):
     category = await db.scalar(
         select(Category).where(
@@ -79,6 +87,8 @@ async def update_category(
         category.parent_id = update_category.parent_id
 
         await db.commit()
+        await resource_versions.bump("categories")
+        await category_tree.refresh(db)
         return {
             "status_code": status.HTTP_200_OK,
             "transaction": "Category update is successful",
@@ -97,7 +107,7 @@ async def delete_category(
     get_user: Annotated[dict, Depends(get_current_user)],
 ):
     if get_user.get("is_admin"):
-        category = db.scalar(
+        category = await db.scalar(
             select(Category).where(
                 Category.slug == category_slug, Category.is_active == True
             )
@@ -110,6 +120,8 @@ async def delete_category(
 
         category.is_active = False
         await db.commit()
+        await resource_versions.bump("categories")
+        await category_tree.refresh(db)
         return {
             "status_code": status.HTTP_200_OK,
             "transaction": "Category delete is successful",
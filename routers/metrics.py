@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.cache import product_cache
+from backend.compression import compressed_cache
+from backend.metrics import format_labels, http_metrics
+from backend.passwords import password_hasher
+from backend.single_flight import single_flight
+from routers.auth import token_cache
+from routers.websockets import manager
+
+router = APIRouter(tags=["metrics"])
+
+
+def _cache_metrics(name: str, cache):
+    def collect() -> list[tuple[str, str, float]]:
+        stats = cache.stats()
+        return [
+            (f"{name}_hits_total", "counter", stats["hits"]),
+            (f"{name}_misses_total", "counter", stats["misses"]),
+            (f"{name}_evictions_total", "counter", stats["evictions"]),
+        ]
+
+    return collect
+
+
+def _password_hasher_metrics() -> list[tuple[str, str, float]]:
+    stats = password_hasher.stats()
+    return [
+        ("password_hash_waiting", "gauge", stats["waiting"]),
+        ("password_hash_running", "gauge", stats["running"]),
+        ("password_hash_completed_total", "counter", stats["completed"]),
+    ]
+
+
+def _compressed_cache_metrics() -> list[tuple[str, str, float]]:
+    stats = compressed_cache.stats()
+    return [
+        ("compressed_cache_hits_total", "counter", stats["hits"]),
+        ("compressed_cache_misses_total", "counter", stats["misses"]),
+        ("compressed_cache_bytes", "gauge", stats["size"]),
+    ]
+
+
+def _single_flight_metrics() -> list[tuple[str, str, float]]:
+    stats = single_flight.stats()
+    return [
+        (f"single_flight_{name}_total{format_labels(('route',), (route,))}", "counter", counts[name])
+        for name in ("executed", "coalesced")
+        for route, counts in stats.items()
+    ]
+
+
+def _websocket_metrics() -> list[tuple[str, str, float]]:
+    stats = manager.stats()
+    return [
+        ("websocket_connections", "gauge", stats["connections"]),
+        ("websocket_messages_dropped_total", "counter", stats["dropped"]),
+        ("websocket_slow_consumers_disconnected_total", "counter", stats["disconnected"]),
+    ]
+
+
+http_metrics.add_collector(_cache_metrics("product_cache", product_cache))
+http_metrics.add_collector(_cache_metrics("token_cache", token_cache))
+http_metrics.add_collector(_password_hasher_metrics)
+http_metrics.add_collector(_compressed_cache_metrics)
+http_metrics.add_collector(_single_flight_metrics)
+http_metrics.add_collector(_websocket_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Метрики приложения в текстовом формате Prometheus.
+    """
+    return PlainTextResponse(
+        http_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,125 @@
+from collections import Counter
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db_depends import get_db
+from backend.reservations import OutOfStock, release, reserve
+from models.orders import Order
+from routers.auth import get_current_user
+from schemas import CreateOrder
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_order(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    get_user: Annotated[dict, Depends(get_current_user)],
+    order: CreateOrder,
+):
+    """
+    Оформить заказ: зарезервировать все позиции корзины в одной транзакции.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        get_user: Объект пользователя
+        order: Позиции корзины
+    Returns:
+        dict: id заказа и время окончания резерва
+    """
+    if get_user.get("is_customer"):
+        items = Counter()
+        for item in order.items:
+            items[item.product_id] += item.quantity
+
+        try:
+            reservation = await reserve(db, get_user.get("id"), items)
+        except OutOfStock as ex:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Not enough stock for product {ex.product_id}",
+            )
+        return {
+            "status_code": status.HTTP_201_CREATED,
+            "order_id": reservation.id,
+            "expires_at": reservation.expires_at,
+        }
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to use this method",
+        )
+
+
+@router.post("/{order_id}/confirm")
+async def confirm_order(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    get_user: Annotated[dict, Depends(get_current_user)],
+    order_id: int,
+):
+    """
+    Подтвердить заказ, пока резерв не истек.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        get_user: Объект пользователя
+        order_id: id заказа
+    Returns:
+        dict: Статус запроса
+    """
+    confirmed = await db.scalar(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.user_id == get_user.get("id"),
+            Order.status == "reserved",
+            Order.expires_at >= datetime.now(),
+        )
+        .values(status="confirmed")
+        .returning(Order.id)
+    )
+    await db.commit()
+    if confirmed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found"
+        )
+    return {"status_code": status.HTTP_200_OK, "transaction": "Successful"}
+
+
+@router.delete("/{order_id}")
+async def cancel_order(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    get_user: Annotated[dict, Depends(get_current_user)],
+    order_id: int,
+):
+    """
+    Отменить резерв и вернуть товар на склад.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        get_user: Объект пользователя
+        order_id: id заказа
+    Returns:
+        dict: Статус запроса
+    """
+    cancelled = await db.scalar(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.user_id == get_user.get("id"),
+            Order.status == "reserved",
+        )
+        .values(status="cancelled")
+        .returning(Order.id)
+    )
+    if cancelled is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found"
+        )
+    await release(db, [cancelled])
+    return {"status_code": status.HTTP_200_OK, "transaction": "Successful"}
@@ -1,16 +1,134 @@
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from fastapi.params import Depends
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.db_depends import get_db
+from backend.revocation import revoke_tokens, revoke_tokens_where
 from models.users import User
+from pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    after_cursor,
+    decode_cursor,
+    keyset_page,
+)
 from routers.auth import get_current_user
+from schemas import (
+    BulkUserAction,
+    BulkUserResult,
+    BulkUserUpdate,
+    UserPage,
+    UserRole,
+)
 
 router = APIRouter(prefix="/permissions", tags=["permissions"])
 
+ROLE_COLUMNS = {
+    UserRole.admin: User.is_admin,
+    UserRole.supplier: User.is_supplier,
+    UserRole.customer: User.is_customer,
+}
+
+# Условия отбора и новые значения полей для массовых операций.
+BULK_ACTIONS = {
+    BulkUserAction.promote: (
+        [User.is_active == True, User.is_supplier == False],
+        {"is_supplier": True, "is_customer": False},
+    ),
+    BulkUserAction.demote: (
+        [User.is_active == True, User.is_supplier == True],
+        {"is_supplier": False, "is_customer": True},
+    ),
+    BulkUserAction.deactivate: (
+        [User.is_active == True, User.is_admin == False],
+        {"is_active": False},
+    ),
+}
+
+
+@router.get("/users", response_model=UserPage)
+async def all_users(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    get_user: Annotated[dict, Depends(get_current_user)],
+    role: UserRole | None = None,
+    is_active: bool | None = None,
+    username_prefix: Annotated[str | None, Query(min_length=1)] = None,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    """
+    Роут для постраничного просмотра пользователей администратором.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        get_user: Текущий пользователь
+        role: Фильтр по роли
+        is_active: Фильтр по активности
+        username_prefix: Начало имени пользователя
+        cursor: Курсор следующей страницы
+        limit: Размер страницы
+    Returns:
+        dict: Страница пользователей и курсор следующей страницы
+    """
+    if not get_user.get("is_admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have admin permission",
+        )
+
+    query = select(User).order_by(User.id)
+    if role is not None:
+        query = query.where(ROLE_COLUMNS[role] == True)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    if username_prefix:
+        query = query.where(User.username.startswith(username_prefix, autoescape=True))
+    if cursor:
+        query = query.where(after_cursor([User.id], decode_cursor(cursor, 1)))
+
+    users = (await db.scalars(query.limit(limit + 1))).all()
+    return keyset_page(users, limit, lambda user: [user.id])
+
+
+@router.patch("/bulk", response_model=BulkUserResult)
+async def bulk_permission(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    get_user: Annotated[dict, Depends(get_current_user)],
+    bulk_update: BulkUserUpdate,
+):
+    """
+    Роут для массового назначения, снятия роли поставщика или удаления пользователей.
+
+    Все пользователи меняются одним запросом UPDATE ... RETURNING, их токены
+    отзываются. Пользователи, к которым операция неприменима, возвращаются в skipped.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        get_user: Текущий пользователь
+        bulk_update: Операция и список id пользователей
+    Returns:
+        dict: Измененные пользователи и id пропущенных
+    """
+    if not get_user.get("is_admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have admin permission",
+        )
+
+    user_ids = sorted(set(bulk_update.user_ids))
+    conditions, values = BULK_ACTIONS[bulk_update.action]
+    users = await revoke_tokens_where(
+        db, [User.id.in_(user_ids), *conditions], **values
+    )
+    updated_ids = {user.id for user in users}
+    return {
+        "updated": sorted(users, key=lambda user: user.id),
+        "skipped": [user_id for user_id in user_ids if user_id not in updated_ids],
+    }
+
 
 @router.patch("/")
 async def supplier_permission(
@@ -27,23 +145,13 @@ async def supplier_permission(
             )
 
         if user.is_supplier:
-            await db.execute(
-                update(User)
-                .where(User.id == user_id)
-                .values(is_supplier=False, is_customer=True)
-            )
-            await db.commit()
+            await revoke_tokens(db, user_id, is_supplier=False, is_customer=True)
             return {
                 "status_code": status.HTTP_200_OK,
                 "detail": "User is no longer supplier",
             }
         else:
-            await db.execute(
-                update(User)
-                .where(User.id == user_id)
-                .values(is_supplier=True, is_customer=False)
-            )
-            await db.commit()
+            await revoke_tokens(db, user_id, is_supplier=True, is_customer=False)
             return {"status_code": status.HTTP_200_OK, "detail": "User is now supplier"}
     else:
         raise HTTPException(
@@ -73,10 +181,7 @@ async def delete_user_permission(
             )
 
         if user.is_active:
-            await db.execute(
-                update(User).where(User.id == user_id).values(is_active=False)
-            )
-            await db.commit()
+            await revoke_tokens(db, user_id, is_active=False)
             return {"status_code": status.HTTP_200_OK, "detail": "User is deleted"}
 
         else:
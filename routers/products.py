@@ -1,34 +1,86 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from slugify import slugify
 from sqlalchemy import insert, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette import status
 
-from backend.db_depends import get_db
+from backend.bulk_import import (
+    CSV_CONTENT_TYPES,
+    NDJSON_CONTENT_TYPES,
+    import_products,
+    iter_lines,
+    iter_records,
+)
+from backend.cache import model_to_dict, product_cache
+from backend.catalog import ProductFilters, facet_counts
+from backend.category_tree import category_tree
+from backend.db_depends import get_db, get_read_db, get_session_factory, read_session
+from backend.search import product_search
+from backend.single_flight import request_key, serialize, single_flight
+from backend.versions import etag_guard, resource_versions
 from models import Category, Product
+from pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    after_cursor,
+    decode_cursor,
+    keyset_page,
+)
 from routers.auth import get_current_user
-from schemas import CreateProduct
+from schemas import CreateProduct, ProductOut, ProductPage
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+EXPORT_BATCH_SIZE = 1000
+PRICE_BUCKET_SIZE = 1000
 
-@router.get("/")
-async def all_products(db: Annotated[AsyncSession, Depends(get_db)]):
-    products = await db.scalars(
-        select(Product)
-        .join(Category)
-        .where(
-            Product.is_activate == True, Category.is_active == True, Product.stock > 0
-        )
-    )
-    list_products = products.all()
-    if not list_products:
+
+@router.get(
+    "/",
+    dependencies=[Depends(etag_guard("products", "categories"))],
+    response_model=ProductPage | list[ProductOut],
+    response_model_exclude_unset=True,
+)
+async def all_products(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    filters: Annotated[ProductFilters, Depends()],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    paginate: bool = True,
+    facets: bool = False,
+    price_bucket_size: Annotated[int, Query(ge=1)] = PRICE_BUCKET_SIZE,
+):
+    conditions = [
+        Product.is_activate == True,
+        Category.is_active == True,
+        Product.stock > 0,
+        *filters.conditions(),
+    ]
+    query = select(Product).join(Category).where(*conditions).order_by(*filters.order_by())
+    if not paginate:
+        list_products = (await db.scalars(query)).all()
+        if not list_products:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="There are no products"
+            )
+        return list_products
+
+    if cursor:
+        query = query.where(filters.after(cursor))
+    products = (await db.scalars(query.limit(limit + 1))).all()
+    if not products and not cursor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="There are no products"
         )
-    return list_products
+    page = keyset_page(products, limit, filters.key)
+    if facets:
+        page["facets"] = await facet_counts(
+            db, conditions, price_bucket_size, join_category=True
+        )
+    return page
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -61,6 +113,7 @@ async def create_product(
             )
         )
         await db.commit()
+        await resource_versions.bump("products")
         return {"status_code": status.HTTP_201_CREATED, "transaction": "Successful"}
     else:
         raise HTTPException(
@@ -69,47 +122,176 @@ async def create_product(
         )
 
 
-@router.get("/{category_slug}")
-async def product_by_category(
-    db: Annotated[AsyncSession, Depends(get_db)], category_slug: str
+@router.post("/import")
+async def bulk_import_products(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    request: Request,
+    get_user: Annotated[dict, Depends(get_current_user)],
 ):
-    category = await db.scalar(select(Category).where(Category.slug == category_slug))
+    if get_user.get("is_admin") or get_user.get("is_supplier"):
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if content_type not in CSV_CONTENT_TYPES | NDJSON_CONTENT_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Body must be CSV or NDJSON",
+            )
 
-    if not category:
+        report = await import_products(
+            db,
+            iter_records(iter_lines(request.stream()), content_type),
+            supplier_id=get_user.get("id") if get_user.get("is_supplier") else None,
+        )
+        if report["inserted"]:
+            await resource_versions.bump("products")
+        return report
+    else:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to use this method",
         )
 
-    subcategories_result = await db.scalars(
-        select(Category).where(Category.parent_id == category.id)
-    )
 
-    categories_id = [category.id for category in subcategories_result.all()]
-    categories_id.append(category.id)
-    products = await db.scalars(
-        select(Product).where(
-            Product.category_id.in_(categories_id),
-            Product.is_activate == True,
-            Product.stock > 0,
+async def _export_catalog(session_context) -> AsyncIterator[str]:
+    # Сессия открывается внутри генератора: она должна жить, пока клиент читает поток.
+    async with session_context as session:
+        products = await session.stream_scalars(
+            select(Product)
+            .join(Category)
+            .where(
+                Product.is_activate == True,
+                Category.is_active == True,
+                Product.stock > 0,
+            )
+            .order_by(Product.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
         )
+        async for partition in products.partitions():
+            yield "".join(
+                ProductOut.model_validate(product).model_dump_json() + "\n"
+                for product in partition
+            )
+
+
+@router.get("/export")
+async def export_products(request: Request):
+    return StreamingResponse(
+        _export_catalog(read_session(request)), media_type="application/x-ndjson"
     )
-    return products.all()
 
 
-@router.get("/detail/{product_slug}")
-async def detail_product(
-    db: Annotated[AsyncSession, Depends(get_db)], product_slug: str
+@router.get("/search", response_model=ProductPage, response_model_exclude_unset=True)
+async def search_products(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
 ):
-    product = await db.scalar(
-        select(Product).where(
-            Product.slug == product_slug, Product.is_activate == True, Product.stock > 0
-        )
-    )
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="There is no product found"
+    fts_table, match, rank = product_search(db.get_bind().dialect.name, q)
+    query = select(Product, rank).join(Category)
+    if fts_table is not None:
+        query = query.join(fts_table, fts_table.c.rowid == Product.id)
+    query = query.where(
+        match, Product.is_activate == True, Category.is_active == True, Product.stock > 0
+    ).order_by(rank.desc(), Product.id.desc())
+
+    if cursor:
+        query = query.where(
+            after_cursor([rank, Product.id], decode_cursor(cursor, 2), descending=True)
         )
-    return product
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    page = keyset_page(rows, limit, lambda row: [row[1], row[0].id])
+    page["items"] = [row[0] for row in page["items"]]
+    return page
+
+
+@router.get(
+    "/{category_slug}",
+    dependencies=[Depends(etag_guard("products", "categories"))],
+    responses={200: {"model": ProductPage | list[ProductOut]}},
+)
+async def product_by_category(
+    request: Request,
+    response: Response,
+    session_factory: Annotated[async_sessionmaker, Depends(get_session_factory)],
+    category_slug: str,
+    filters: Annotated[ProductFilters, Depends()],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    paginate: bool = True,
+    facets: bool = False,
+    price_bucket_size: Annotated[int, Query(ge=1)] = PRICE_BUCKET_SIZE,
+):
+    # Одинаковые одновременные запросы ждут одного обращения к базе данных,
+    # сессия открывается только внутри него. Ответ защищен ETag, поэтому
+    # читается с основной базы, а не с реплики.
+    async def load() -> bytes:
+        async with session_factory() as db:
+            await category_tree.ensure_loaded(db)
+            category = category_tree.by_slug.get(category_slug)
+
+            if not category:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
+                )
+
+            conditions = [
+                Product.category_id.in_(category_tree.subtree_ids(category["id"])),
+                Product.is_activate == True,
+                Product.stock > 0,
+                *filters.conditions(),
+            ]
+            query = select(Product).where(*conditions).order_by(*filters.order_by())
+            if not paginate:
+                return serialize(list[ProductOut], (await db.scalars(query)).all())
+
+            if cursor:
+                query = query.where(filters.after(cursor))
+            products = (await db.scalars(query.limit(limit + 1))).all()
+            page = keyset_page(products, limit, filters.key)
+            if facets:
+                page["facets"] = await facet_counts(
+                    db, conditions, price_bucket_size, join_category=False
+                )
+            return serialize(ProductPage, page, exclude_unset=True)
+
+    body = await single_flight.do("product_by_category", request_key(request), load)
+    result = Response(body, media_type="application/json")
+    # Заголовки зависимостей (ETag, cookie) переносятся вместе с повторами.
+    result.headers.raw.extend(response.headers.raw)
+    return result
+
+
+@router.get("/detail/{product_slug}", responses={200: {"model": ProductOut}})
+async def detail_product(
+    request: Request,
+    session_factory: Annotated[async_sessionmaker, Depends(get_session_factory)],
+    product_slug: str,
+):
+    async def load() -> bytes:
+        cached = await product_cache.get(product_slug)
+        if cached is not None:
+            return serialize(ProductOut, cached)
+
+        # Промах кэша читается с основной базы: отстающая реплика не должна
+        # заполнить кэш устаревшими данными сразу после изменения продукта.
+        async with session_factory() as db:
+            product = await db.scalar(
+                select(Product).where(
+                    Product.slug == product_slug,
+                    Product.is_activate == True,
+                    Product.stock > 0,
+                )
+            )
+        if not product:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="There is no product found"
+            )
+        product_data = model_to_dict(product)
+        await product_cache.set(product_slug, product_data)
+        return serialize(ProductOut, product_data)
+
+    body = await single_flight.do("detail_product", request_key(request), load)
+    return Response(body, media_type="application/json")
 
 
 @router.put("/{product_slug}")
@@ -147,6 +329,8 @@ async def update_product(
             product.stock = update_product.stock
 
             await db.commit()
+            await product_cache.delete(product_slug, product.slug)
+            await resource_versions.bump("products")
             return {
                 "status_code": status.HTTP_200_OK,
                 "transaction": "Product update is successful",
@@ -184,6 +368,8 @@ async def delete_product(
         if get_user.get("is_admin") or get_user.get("id") == product.supplier_id:
             product.is_activate = False
             await db.commit()
+            await product_cache.delete(product_slug)
+            await resource_versions.bump("products")
             return {
                 "status_code": status.HTTP_200_OK,
                 "transaction": "Product delete is successful",
@@ -1,51 +1,207 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy import select, insert, update, func
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.db_depends import get_db
+from backend.cache import product_cache
+from backend.db_depends import get_db, get_read_db, read_session
+from backend.ratings import add_grade, remove_grade
+from backend.versions import resource_versions
 from models import Product
-from models.reviews import Review
+from models.reviews import ProductGradeCount, Review
+from pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    after_cursor,
+    decode_cursor,
+    keyset_page,
+)
 from routers.auth import get_current_user
-from schemas import CreateReview
+from schemas import CreateReview, RatingSummary, ReviewOut, ReviewPage
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
+STREAM_BATCH_SIZE = 1000
 
-@router.get("/")
-async def all_reviews(db: Annotated[AsyncSession, Depends(get_db)]):
+
+def grade_conditions(min_grade: int | None, max_grade: int | None) -> list:
     """
-    Роут для получения всех отзывов по продуктам, у которых поле is_activate = True.
+    Условия фильтра по оценке отзыва.
 
     Args:
-        db: Объект асинхронной сессии с базой данных
+        min_grade: Минимальная оценка
+        max_grade: Максимальная оценка
     Returns:
-        dict: Словарь с отзывами
+        list: Выражения SQLAlchemy
     """
-    reviews = await db.scalars(
-        select(Review).join(Product).where(Product.is_activate == True)
+    conditions = []
+    if min_grade is not None:
+        conditions.append(Review.grade >= min_grade)
+    if max_grade is not None:
+        conditions.append(Review.grade <= max_grade)
+    return conditions
+
+
+async def _stream_reviews(query, session_context) -> AsyncIterator[str]:
+    # Сессия открывается внутри генератора: она должна жить, пока клиент читает поток.
+    async with session_context as session:
+        reviews = await session.stream_scalars(
+            query.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        # Одна часть потока на пачку строк: каждая часть - отдельное сообщение
+        # ASGI и отдельный сброс буфера при сжатии ответа.
+        opening = "["
+        async for partition in reviews.partitions():
+            yield opening + ",".join(
+                ReviewOut.model_validate(review).model_dump_json() for review in partition
+            )
+            opening = ","
+        yield "[]" if opening == "[" else "]"
+
+
+async def _reviews_page(
+    request: Request,
+    db: AsyncSession,
+    conditions: list,
+    cursor: str | None,
+    limit: int,
+    paginate: bool,
+):
+    query = (
+        select(Review)
+        .where(*conditions)
+        .order_by(Review.comment_date.desc(), Review.id.desc())
     )
-    return reviews.all()
+    if not paginate:
+        return StreamingResponse(
+            _stream_reviews(query, read_session(request)), media_type="application/json"
+        )
+
+    if cursor:
+        query = query.where(
+            after_cursor(
+                [Review.comment_date, Review.id],
+                decode_cursor(cursor, 2),
+                descending=True,
+            )
+        )
+    reviews = (await db.scalars(query.limit(limit + 1))).all()
+    return keyset_page(reviews, limit, lambda review: [review.comment_date, review.id])
 
 
-@router.get("/{product_slug}")
+@router.get("/", response_model=ReviewPage)
+async def all_reviews(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    min_grade: Annotated[int | None, Query(ge=1, le=10)] = None,
+    max_grade: Annotated[int | None, Query(ge=1, le=10)] = None,
+    paginate: bool = True,
+):
+    """
+    Роут для получения активных отзывов по продуктам, у которых поле is_activate = True.
+
+    Отзывы отдаются страницами от новых к старым. При paginate=false весь список
+    передается потоком.
+
+    Args:
+        request: Объект запроса
+        db: Объект асинхронной сессии с базой данных
+        cursor: Курсор следующей страницы
+        limit: Размер страницы
+        min_grade: Минимальная оценка
+        max_grade: Максимальная оценка
+        paginate: Отдавать ответ страницами
+    Returns:
+        dict: Страница отзывов и курсор следующей страницы
+    """
+    conditions = [
+        Review.is_active == True,
+        Review.product_id.in_(select(Product.id).where(Product.is_activate == True)),
+        *grade_conditions(min_grade, max_grade),
+    ]
+    return await _reviews_page(request, db, conditions, cursor, limit, paginate)
+
+
+@router.get("/{product_slug}", response_model=ReviewPage)
 async def get_reviews_about_product(
-    db: Annotated[AsyncSession, Depends(get_db)], product_slug: str
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    product_slug: str,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    min_grade: Annotated[int | None, Query(ge=1, le=10)] = None,
+    max_grade: Annotated[int | None, Query(ge=1, le=10)] = None,
+    paginate: bool = True,
 ):
     """
-    Получить все отзывы по продукту.
+    Получить активные отзывы по продукту, от новых к старым.
 
     Args:
+        request: Объект запроса
         db: Объект асинхронной сессии с базой данных
         product_slug: slug продукта для получения отзывов
+        cursor: Курсор следующей страницы
+        limit: Размер страницы
+        min_grade: Минимальная оценка
+        max_grade: Максимальная оценка
+        paginate: Отдавать ответ страницами
     Returns:
-        dict: Словарь с отзывами
+        dict: Страница отзывов и курсор следующей страницы
     """
-    reviews = await db.scalars(
-        select(Review).join(Product).where(Product.slug == product_slug)
-    )
-    return reviews.all()
+    conditions = [
+        Review.product_id
+        == select(Product.id).where(Product.slug == product_slug).scalar_subquery(),
+        Review.is_active == True,
+        *grade_conditions(min_grade, max_grade),
+    ]
+    return await _reviews_page(request, db, conditions, cursor, limit, paginate)
+
+
+@router.get("/{product_slug}/rating", response_model=RatingSummary)
+async def rating_summary(
+    db: Annotated[AsyncSession, Depends(get_read_db)], product_slug: str
+):
+    """
+    Получить рейтинг продукта и распределение оценок без чтения таблицы отзывов.
+
+    Args:
+        db: Объект асинхронной сессии с базой данных
+        product_slug: slug продукта
+    Returns:
+        dict: Рейтинг, количество отзывов и гистограмма оценок
+    """
+    rows = (
+        await db.execute(
+            select(
+                Product.id,
+                Product.rating,
+                Product.review_count,
+                ProductGradeCount.grade,
+                ProductGradeCount.count,
+            )
+            .outerjoin(ProductGradeCount, ProductGradeCount.product_id == Product.id)
+            .where(Product.slug == product_slug, Product.is_activate == True)
+        )
+    ).all()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+        )
+
+    histogram = {grade: 0 for grade in range(1, 11)}
+    for row in rows:
+        if row.grade is not None:
+            histogram[row.grade] = row.count
+    return {
+        "product_id": rows[0].id,
+        "rating": rows[0].rating,
+        "review_count": rows[0].review_count,
+        "histogram": histogram,
+    }
 
 
 @router.post("/{product_slug}/create")
@@ -81,17 +237,10 @@ async def create_review(
                 grade=review.grade,
             )
         )
+        await add_grade(db, product.id, review.grade)
         await db.commit()
-
-        grade = await db.scalar(
-            select(func.avg(Review.grade))
-            .join(Product)
-            .where(Product.slug == product_slug)
-        )
-        await db.execute(
-            update(Product).where(Product.slug == product_slug).values(rating=grade)
-        )
-        await db.commit()
+        await product_cache.delete(product.slug)
+        await resource_versions.bump("products")
         return {"status_code": status.HTTP_201_CREATED, "transaction": "Successful"}
 
     else:
@@ -118,19 +267,24 @@ async def delete_review(
         dict: Статус запроса
     """
     if get_user.get("is_admin"):
-        review = await db.scalar(
-            select(Review).where(Review.id == review_id, Review.is_active == True)
-        )
+        review = (
+            await db.execute(
+                update(Review)
+                .where(Review.id == review_id, Review.is_active == True)
+                .values(is_active=False)
+                .returning(Review.product_id, Review.grade)
+            )
+        ).first()
 
         if not review:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Review not found"
             )
 
-        await db.execute(
-            update(Review).where(Review.id == review_id).values(is_active=False)
-        )
+        product_slug = await remove_grade(db, review.product_id, review.grade)
         await db.commit()
+        await product_cache.delete(product_slug)
+        await resource_versions.bump("products")
         return {"status_code": status.HTTP_200_OK, "transaction": "Successful"}
 
     else:
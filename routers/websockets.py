@@ -9,11 +9,12 @@ manager = ConnectionManager()
 
 @router.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: int):
-    await manager.connect(websocket)
+    connection = await manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_text()
             await manager.broadcast(f"Client {client_id}: {data}")
-    except WebSocketDisconnect as e:
-        manager.connections.remove(websocket)
-        print(f'Connection closed {e.code}')
\ No newline at end of file
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(connection)
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, Field
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CreateProduct(BaseModel):
@@ -29,8 +32,184 @@ class CreateUser(BaseModel):
     password: str
 
 
+class RefreshToken(BaseModel):
+    """Схема для обновления пары токенов."""
+
+    refresh_token: str
+
+
 class CreateReview(BaseModel):
     """Схема для создания отзыва."""
 
     comment: str | None = Field(None, description="Комментарий отзыва")
     grade: int = Field(..., description="Оценка отзыва", ge=1, le=10)
+
+
+class ProductSort(str, Enum):
+    """Варианты сортировки списка продуктов."""
+
+    id = "id"
+    newest = "newest"
+    price = "price"
+    price_desc = "-price"
+    rating = "rating"
+    rating_desc = "-rating"
+
+
+class UserRole(str, Enum):
+    """Роли пользователей для фильтра списка."""
+
+    admin = "admin"
+    supplier = "supplier"
+    customer = "customer"
+
+
+class BulkUserAction(str, Enum):
+    """Массовые операции над пользователями."""
+
+    promote = "promote"
+    demote = "demote"
+    deactivate = "deactivate"
+
+
+class BulkUserUpdate(BaseModel):
+    """Схема массового изменения прав пользователей."""
+
+    action: BulkUserAction
+    user_ids: list[int] = Field(
+        ..., description="id пользователей", min_length=1, max_length=1000
+    )
+
+
+class CartItem(BaseModel):
+    """Схема позиции корзины."""
+
+    product_id: int
+    quantity: int = Field(..., description="Количество товара", ge=1)
+
+
+class CreateOrder(BaseModel):
+    """Схема для оформления заказа."""
+
+    items: list[CartItem] = Field(..., description="Позиции корзины", min_length=1)
+
+
+class ProductOut(BaseModel):
+    """Схема продукта в ответах API."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str | None
+    slug: str | None
+    description: str | None
+    price: int | None
+    image_url: str | None
+    supplier_id: int | None
+    category_id: int | None
+    stock: int | None
+    rating: float | None
+    review_count: int | None = None
+    is_activate: bool | None
+
+
+class CategoryFacet(BaseModel):
+    """Схема количества продуктов в категории."""
+
+    category_id: int | None
+    count: int
+
+
+class PriceBucketFacet(BaseModel):
+    """Схема количества продуктов в ценовом диапазоне."""
+
+    min_price: int
+    max_price: int
+    count: int
+
+
+class ProductFacets(BaseModel):
+    """Схема фасетов списка продуктов."""
+
+    categories: list[CategoryFacet]
+    price_buckets: list[PriceBucketFacet]
+
+
+class ProductPage(BaseModel):
+    """Схема страницы списка продуктов."""
+
+    items: list[ProductOut]
+    next_cursor: str | None
+    facets: ProductFacets | None = None
+
+
+class RatingSummary(BaseModel):
+    """Схема сводки рейтинга продукта."""
+
+    product_id: int
+    rating: float | None
+    review_count: int | None
+    histogram: dict[int, int]
+
+
+class CategoryOut(BaseModel):
+    """Схема категории в ответах API."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str | None
+    slug: str | None
+    is_active: bool | None
+    parent_id: int | None
+
+
+class ReviewOut(BaseModel):
+    """Схема отзыва в ответах API."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int | None
+    product_id: int | None
+    comment: str | None
+    comment_date: datetime | None
+    grade: int | None
+    is_active: bool | None
+
+
+class ReviewPage(BaseModel):
+    """Схема страницы списка отзывов."""
+
+    items: list[ReviewOut]
+    next_cursor: str | None
+
+
+class UserOut(BaseModel):
+    """Схема пользователя в ответах API, без хэша пароля."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    first_name: str | None
+    last_name: str | None
+    username: str | None
+    email: str | None
+    is_active: bool | None
+    is_admin: bool | None
+    is_supplier: bool | None
+    is_customer: bool | None
+
+
+class UserPage(BaseModel):
+    """Схема страницы списка пользователей."""
+
+    items: list[UserOut]
+    next_cursor: str | None
+
+
+class BulkUserResult(BaseModel):
+    """Схема результата массового изменения прав."""
+
+    updated: list[UserOut]
+    skipped: list[int]
@@ -1,29 +1,130 @@
-from typing import List
+import asyncio
+from contextlib import suppress
 
+from loguru import logger
+from starlette import status
 from starlette.websockets import WebSocket
 
+import config
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+
+class Connection:
+    """
+    Активный вебсокет с собственной очередью отправки.
+
+    Сообщения из очереди отправляет отдельная задача writer, поэтому
+    медленный клиент не задерживает рассылку остальным.
+    """
+
+    __slots__ = ("websocket", "queue", "writer", "overflowed")
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.writer: asyncio.Task | None = None
+        self.overflowed = False
+
 
 class ConnectionManager:
     """
     Класс для работы с вебсокетами.
+
+    broadcast только кладет сообщение в очереди соединений и не ждет отправки.
+    Если очередь клиента заполнена, действует политика policy: drop_oldest -
+    выбросить самое старое сообщение из очереди, disconnect - закрыть
+    соединение с кодом 1013.
     """
 
-    def __init__(self):
-        self.connections: List[WebSocket] = []
-        print("Creating a list to active connections", self.connections)
+    def __init__(
+        self,
+        queue_size: int = config.WEBSOCKET_SEND_QUEUE_SIZE,
+        policy: str = config.WEBSOCKET_SLOW_CONSUMER_POLICY,
+    ):
+        self.queue_size = queue_size
+        self.policy = policy
+        self.connections: set[Connection] = set()
+        self.dropped = 0
+        self.disconnected = 0
 
-    async def connect(self, websocket:WebSocket):
+    async def connect(self, websocket: WebSocket) -> Connection:
         """
         Метод для подключения вебсокета.
+
+        Args:
+            websocket: Объект вебсокета
+        Returns:
+            Connection: Соединение, которое нужно передать в disconnect
         """
         await websocket.accept()
-        self.connections.append(websocket)
-        print("New Active connections are ", self.connections)
+        connection = Connection(websocket, self.queue_size)
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.connections.add(connection)
+        return connection
+
+    def disconnect(self, connection: Connection):
+        """
+        Метод для отключения вебсокета: соединение удаляется, отправка прекращается.
+        """
+        self.connections.discard(connection)
+        if connection.writer is not None:
+            connection.writer.cancel()
 
     async def broadcast(self, data: str):
         """
         Метод для отправки сообщений всем активным вебсокетам.
         """
-        for connection in self.connections:
-            await connection.send_text(data)
-            print("In broadcast: sent msg to ", connection)
\ No newline at end of file
+        slow = [
+            connection for connection in self.connections
+            if not self._enqueue(connection, data)
+        ]
+        for connection in slow:
+            self._evict(connection)
+
+    def _enqueue(self, connection: Connection, data: str) -> bool:
+        queue = connection.queue
+        if queue.full():
+            if self.policy == DISCONNECT:
+                return False
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(data)
+        return True
+
+    def _evict(self, connection: Connection):
+        logger.warning(
+            f"Closing slow websocket consumer {connection.websocket.client}: "
+            f"send queue of {self.queue_size} messages is full"
+        )
+        self.disconnected += 1
+        connection.overflowed = True
+        self.disconnect(connection)
+
+    async def _write(self, connection: Connection):
+        websocket = connection.websocket
+        try:
+            while True:
+                data = await connection.queue.get()
+                await websocket.send_text(data)
+        except asyncio.CancelledError:
+            if connection.overflowed:
+                with suppress(Exception):
+                    await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        except Exception:
+            # Клиент отключился во время отправки, соединение закроет обработчик.
+            self.connections.discard(connection)
+
+    def stats(self) -> dict:
+        """
+        Получить счетчики рассылки.
+
+        Returns:
+            dict: Число соединений, выброшенных сообщений и отключенных клиентов
+        """
+        return {
+            "connections": len(self.connections),
+            "dropped": self.dropped,
+            "disconnected": self.disconnected,
+        }